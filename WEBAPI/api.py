@@ -8,24 +8,48 @@ it can be deployed like a serverless function.
 from __future__ import annotations
 
 import argparse
+import fnmatch
 import gzip
+import hashlib
 import json
 import os
 import re
+import secrets
 import shutil
 import sqlite3
 import subprocess
 import sys
 import threading
-import uuid
-from datetime import datetime
+import time
+import weakref
+import zlib
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from itertools import groupby
+from operator import itemgetter
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, BinaryIO, Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
 
-from fastapi import BackgroundTasks, FastAPI, HTTPException, Query, UploadFile, File, Form, Body
-from fastapi.responses import HTMLResponse, StreamingResponse
+from fastapi import BackgroundTasks, FastAPI, HTTPException, Query, Request, UploadFile, File, Form, Body
+from fastapi.responses import HTMLResponse, JSONResponse, Response, StreamingResponse
 from fastapi.staticfiles import StaticFiles
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, PrivateAttr
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# Parser for JSON columns read back from SQLite; orjson accepts str and is
+# several times faster than the stdlib on the larger result blobs.
+_json_loads = orjson.loads if orjson is not None else json.loads
 
 # Ensure runner.py is importable when the service is launched from the
 # WEBAPI directory.
@@ -37,6 +61,67 @@ if str(PROJECT_ROOT) not in sys.path:
 from runner import ScriptRunner  # noqa: E402
 
 
+def _json_default(obj: Any) -> Any:
+    if isinstance(obj, datetime):
+        return obj.isoformat()
+    if isinstance(obj, BaseModel):
+        return obj.dict()
+    return str(obj)
+
+
+def _json_dumps(obj: Any) -> str:
+    """Serialise ``obj`` for a TEXT column, using orjson when available."""
+    if orjson is None:
+        return json.dumps(obj, default=_json_default)
+    return orjson.dumps(obj, default=_json_default, option=orjson.OPT_NON_STR_KEYS).decode("utf-8")
+
+
+# result_json payloads at least this large are stored compressed as a BLOB
+# (zstd when zstandard is installed, zlib otherwise); smaller ones, and rows
+# written before, stay plain JSON text.
+_COMPRESS_MIN_BYTES = 1024
+_ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+# zstd (de)compressor objects must not be shared between threads.
+_zstd_tls = threading.local()
+
+
+def _pack_json(obj: Any) -> Union[str, bytes]:
+    text = _json_dumps(obj)
+    if len(text) < _COMPRESS_MIN_BYTES:
+        return text
+    if zstandard is None:
+        return zlib.compress(text.encode("utf-8"))
+    cctx = getattr(_zstd_tls, "cctx", None)
+    if cctx is None:
+        cctx = _zstd_tls.cctx = zstandard.ZstdCompressor(level=3)
+    return cctx.compress(text.encode("utf-8"))
+
+
+def _unpack_json(value: Union[str, bytes]) -> Any:
+    if isinstance(value, bytes):
+        if value[:4] == _ZSTD_MAGIC:
+            if zstandard is None:
+                raise ImportError(
+                    "zstandard required to read this zstd-compressed run. Install with: pip install zstandard"
+                )
+            dctx = getattr(_zstd_tls, "dctx", None)
+            if dctx is None:
+                dctx = _zstd_tls.dctx = zstandard.ZstdDecompressor()
+            value = dctx.decompress(value)
+        else:
+            value = zlib.decompress(value)
+    return _json_loads(value)
+
+
+class ORJSONResponse(JSONResponse):
+    """JSON response rendered with orjson when available (stdlib json otherwise)."""
+
+    def render(self, content: Any) -> bytes:
+        if orjson is None:
+            return json.dumps(content, default=_json_default, separators=(",", ":")).encode("utf-8")
+        return orjson.dumps(content, default=_json_default, option=orjson.OPT_NON_STR_KEYS)
+
+
 class RunRequest(BaseModel):
     """Input payload for a script execution."""
 
@@ -89,6 +174,9 @@ class RunRequest(BaseModel):
     enable_dependency_scanning: bool = Field(False, description="Scan requirements.txt for vulnerabilities")
     enable_cost_tracking: bool = Field(False, description="Enable cloud cost tracking during execution")
 
+    # Serialised form memoised by _request_json(); requests are not mutated once queued.
+    _json_cache: Optional[str] = PrivateAttr(None)
+
 
 class RunRecord(BaseModel):
     """Stored representation of a running or completed job."""
@@ -104,29 +192,301 @@ class RunRecord(BaseModel):
     correlation_id: Optional[str] = None
     run_status: Optional[str] = None  # runner's own status: success/failed/timeout/killed
     error_summary: Optional[Dict[str, Any]] = None
+    # Full captured output lives on disk; the logs endpoint streams from here.
+    # Server paths, so they are kept out of every API response.
+    stdout_path: Optional[str] = Field(None, exclude=True)
+    stderr_path: Optional[str] = Field(None, exclude=True)
 
 
 RUN_DB_PATH = Path(os.environ.get("WEBAPI_RUN_DB", PROJECT_ROOT / "WEBAPI" / "runs.db"))
 ALLOWED_SCRIPT_ROOT = Path(os.environ.get("WEBAPI_ALLOWED_ROOT", PROJECT_ROOT)).resolve()
 UPLOAD_DIR = PROJECT_ROOT / "WEBAPI" / "uploads"
+LOG_DIR = Path(os.environ.get("WEBAPI_LOG_DIR", PROJECT_ROOT / "WEBAPI" / "logs"))
 
 
-class RunStore:
-    """Lightweight SQLite-backed store for run metadata and logs."""
+def _request_json(request: RunRequest) -> str:
+    """Serialise ``request`` for the runs table, once per instance."""
+    if request._json_cache is None:
+        request._json_cache = _json_dumps(request.dict())
+    return request._json_cache
+
+
+def _write_log_file(run_id: str, stream: str, text: Optional[str]) -> Optional[str]:
+    """Persist one captured output stream under LOG_DIR and return its path."""
+    if not text:
+        return None
+    LOG_DIR.mkdir(parents=True, exist_ok=True)
+    path = LOG_DIR / f"{run_id}.{stream}.log"
+    path.write_text(text, encoding="utf-8", errors="replace")
+    return str(path)
+
+
+# Placeholder left in ``result["stdout"/"stderr"]`` once the text lives in a log file.
+_LOG_IN_FILE = "<in file>"
+# Characters of each stream kept in the runs table for dashboard previews.
+_LOG_TAIL_CHARS = 8 * 1024
+
+
+def _log_tail(text: Optional[str]) -> Optional[str]:
+    if not text or text == _LOG_IN_FILE:
+        return None
+    return text[-_LOG_TAIL_CHARS:]
+
+
+def _spill_log(run_id: str, stream: str, text: Optional[str]) -> Optional[str]:
+    """Write ``text`` to a log file only if it would not fit in the row's tail.
+
+    Short output (the common case) stays in the runs table as-is, so it costs
+    no file write, read back or unlink.
+    """
+    if not text or len(text) <= _LOG_TAIL_CHARS:
+        return None
+    return _write_log_file(run_id, stream, text)
+
+
+def _logged_streams(record: RunRecord) -> List[str]:
+    return [name for name in ("stdout", "stderr") if getattr(record, f"{name}_path")]
+
+
+def _strip_logs(result: Dict[str, Any], streams: Iterable[str] = ("stdout", "stderr")) -> Dict[str, Any]:
+    """Return a shallow copy of ``result`` with the given streams replaced by sentinels."""
+    stripped = dict(result)
+    for key in streams:
+        if stripped.get(key):
+            stripped[key] = _LOG_IN_FILE
+    return stripped
+
+
+def _unlink_quietly(*paths: Optional[str]) -> None:
+    for path in paths:
+        if path:
+            try:
+                os.unlink(path)
+            except OSError:
+                pass
+
+
+def _open_log_file(path: Optional[str]) -> Optional[BinaryIO]:
+    """Open a run's log file for reading, or return None if it is gone."""
+    if not path:
+        return None
+    try:
+        return open(path, "rb")
+    except OSError:
+        return None
+
+
+def _iter_log_file(f: BinaryIO, chunk_size: int = 65536) -> Iterator[bytes]:
+    with f:
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                break
+            yield chunk
+
+
+def _accepts_gzip(request: Request) -> bool:
+    """Whether the client's Accept-Encoding allows gzip (a ``q=0`` refuses it)."""
+    weights: Dict[str, float] = {}
+    for item in request.headers.get("accept-encoding", "").split(","):
+        coding, _, params = item.partition(";")
+        q = 1.0
+        for param in params.split(";"):
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        weights[coding.strip().lower()] = q
+    return weights.get("gzip", weights.get("*", 0.0)) > 0
+
+
+def _gzip_stream(chunks: Iterable[Any]) -> Iterator[bytes]:
+    """Compress a stream of str/bytes chunks into a single gzip member on the fly."""
+    compressor = zlib.compressobj(6, zlib.DEFLATED, zlib.MAX_WBITS | 16)
+    for chunk in chunks:
+        if isinstance(chunk, str):
+            chunk = chunk.encode("utf-8")
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+# Prepared statements kept per pooled connection. The stdlib default (128)
+# is easily churned by the per-length IN (...) lists and list_scripts'
+# filter combinations, which would evict the hot fixed queries.
+_STATEMENT_CACHE_SIZE = 256
+
+# Seconds a RunStore.get_stats() answer is reused when nothing was written.
+_STATS_TTL = 2.0
+
+# Seconds between background WAL checkpoints of each database file.
+_WAL_CHECKPOINT_INTERVAL = 30.0
+
+# Seconds between background ``PRAGMA optimize`` runs.
+_DB_MAINTENANCE_INTERVAL = 15 * 60
+
+# Bytes a checkpointed WAL file is truncated back to, so one burst of runs
+# does not leave a large file on disk.
+_JOURNAL_SIZE_LIMIT = 64 * 1024 * 1024
+
+
+def _tune_connection(conn: sqlite3.Connection) -> sqlite3.Connection:
+    """Apply the per-connection pragmas shared by every pooled handle."""
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA busy_timeout=30000")
+    conn.execute("PRAGMA temp_store=MEMORY")
+    conn.execute("PRAGMA cache_size=-64000")
+    # Read pages straight from a memory map instead of copying them through
+    # read() into the page cache.
+    conn.execute("PRAGMA mmap_size=268435456")
+    return conn
+
+
+class _Writer:
+    """The single read-write connection, and its lock, for one database file."""
+
+    def __init__(self, db_path: Path) -> None:
+        self.lock = threading.Lock()
+        self.conn = _tune_connection(
+            sqlite3.connect(
+                db_path, timeout=30, check_same_thread=False, isolation_level=None,
+                cached_statements=_STATEMENT_CACHE_SIZE,
+            )
+        )
+        # journal_mode=WAL is persistent in the database file, so it only
+        # needs to be set once; readers then no longer block on writers.
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(f"PRAGMA journal_size_limit={_JOURNAL_SIZE_LIMIT}")
+        # Writes are frequent small commits (run status updates, scan
+        # batches); the maintenance thread checkpoints them instead of
+        # whichever commit happens to cross the auto-checkpoint threshold.
+        self.conn.execute("PRAGMA wal_autocheckpoint=0")
+        # The thread holds only a weak reference, and is told to stop once
+        # the last store on this file lets the writer go.
+        stop = threading.Event()
+        self._maintenance = threading.Thread(
+            target=_maintenance_loop, args=(weakref.ref(self), stop),
+            name="db-maintenance", daemon=True,
+        )
+        self._maintenance.start()
+        weakref.finalize(self, stop.set)
+
+    def checkpoint(self) -> None:
+        """Copy committed WAL frames back into the database without blocking."""
+        with self.lock:
+            self.conn.execute("PRAGMA wal_checkpoint(PASSIVE)")
+
+    def optimize(self) -> None:
+        """Refresh query planner statistics; sampled, so cheap even on big tables."""
+        with self.lock:
+            self.conn.execute("PRAGMA analysis_limit=400")
+            # Reads run on the read-only handles, so this connection has not
+            # queried most tables; 0x10002 makes optimize consider all of them.
+            self.conn.execute("PRAGMA optimize=0x10002")
+
+
+def _maintenance_loop(ref: "weakref.ref[_Writer]", stop: threading.Event) -> None:
+    """Periodically checkpoint a writer's WAL and refresh query planner stats."""
+    next_optimize = time.monotonic() + _DB_MAINTENANCE_INTERVAL
+    while not stop.wait(_WAL_CHECKPOINT_INTERVAL):
+        writer = ref()
+        if writer is None:
+            return
+        try:
+            writer.checkpoint()
+            if time.monotonic() >= next_optimize:
+                next_optimize = time.monotonic() + _DB_MAINTENANCE_INTERVAL
+                writer.optimize()
+        except sqlite3.Error:
+            pass
+        # Do not keep the writer alive while sleeping.
+        writer = None
+
+
+# Stores on the same file share one _Writer, so their writes queue on a
+# Python lock instead of retrying against each other in SQLite's busy handler.
+_WRITERS: "weakref.WeakValueDictionary[str, _Writer]" = weakref.WeakValueDictionary()
+_WRITERS_LOCK = threading.Lock()
+
+
+class _SQLiteStore:
+    """Base for the SQLite-backed stores: pooled, pre-tuned connections.
+
+    Connections are opened once and reused: a single read-write handle
+    serialised by ``_lock`` and one read-only handle per worker thread, so
+    each request keeps SQLite's page cache instead of reopening the file.
+    """
 
     def __init__(self, db_path: Path) -> None:
         self.db_path = db_path
         self.db_path.parent.mkdir(parents=True, exist_ok=True)
-        self._lock = threading.Lock()
-        self._ensure_table()
+        key = str(self.db_path.resolve())
+        with _WRITERS_LOCK:
+            writer = _WRITERS.get(key)
+            if writer is None:
+                writer = _WRITERS[key] = _Writer(self.db_path)
+        self._writer = writer
+        self._lock = writer.lock
+        self._rw = writer.conn
+        self._ro_uri = self.db_path.resolve().as_uri() + "?mode=ro"
+        self._tls = threading.local()
+        # Bumped after every committed write so cached reads can tell they
+        # are stale.
+        self._generation = 0
+
+    @contextmanager
+    def _read(self) -> Iterator[sqlite3.Connection]:
+        # Each threadpool worker lazily opens its own read-only handle, so
+        # concurrent readers never queue behind one another.
+        conn = getattr(self._tls, "conn", None)
+        if conn is None:
+            conn = _tune_connection(
+                sqlite3.connect(self._ro_uri, uri=True, timeout=30, cached_statements=_STATEMENT_CACHE_SIZE)
+            )
+            self._tls.conn = conn
+        yield conn
+
+    @contextmanager
+    def _write(self) -> Iterator[sqlite3.Connection]:
+        with self._lock:
+            self._rw.execute("BEGIN IMMEDIATE")
+            try:
+                yield self._rw
+            except BaseException:
+                self._rw.execute("ROLLBACK")
+                raise
+            self._rw.execute("COMMIT")
+            self._generation += 1
+
+    @contextmanager
+    def _rollback_on_error(self) -> Iterator[None]:
+        """Roll back a transaction opened outside ``_write()`` if its block fails.
+
+        Callers hold ``_lock``; otherwise a failure would leave the shared
+        writer inside the transaction and break every later ``_write()``.
+        """
+        try:
+            yield
+        except BaseException:
+            if self._rw.in_transaction:
+                self._rw.execute("ROLLBACK")
+            raise
+
+
+class RunStore(_SQLiteStore):
+    """Lightweight SQLite-backed store for run metadata and logs."""
 
-    def _connect(self) -> sqlite3.Connection:
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
-        return conn
+    def __init__(self, db_path: Path) -> None:
+        super().__init__(db_path)
+        self._stats_cache: Dict[str, Any] = {"generation": -1, "expires": 0.0, "value": None}
+        self._ensure_table()
 
     def _ensure_table(self) -> None:
-        with self._connect() as conn:
+        with self._write() as conn:
             conn.execute(
                 """
                 CREATE TABLE IF NOT EXISTS runs (
@@ -142,7 +502,9 @@ class RunStore:
                     correlation_id TEXT,
                     run_status TEXT,
                     error_summary_json TEXT,
-                    visualization_report_json TEXT
+                    visualization_report_json TEXT,
+                    stdout_path TEXT,
+                    stderr_path TEXT
                 )
                 """
             )
@@ -154,31 +516,81 @@ class RunStore:
                 ("run_status", "TEXT"),
                 ("error_summary_json", "TEXT"),
                 ("visualization_report_json", "TEXT"),
+                ("stdout_path", "TEXT"),
+                ("stderr_path", "TEXT"),
             ]
             _ALLOWED_COLS = frozenset(col for col, _ in _NEW_COLS)
+            existing = {row["name"] for row in conn.execute("PRAGMA table_info(runs)")}
             for col, typedef in _NEW_COLS:
                 assert col in _ALLOWED_COLS  # guard against accidental expansion
-                try:
+                if col not in existing:
                     conn.execute(f"ALTER TABLE runs ADD COLUMN {col} {typedef}")  # noqa: S608
-                except sqlite3.OperationalError:
-                    pass  # column already exists
-            conn.commit()
+            # list() pages by started_at (optionally filtered by status) and
+            # get_stats() range-scans started_at for its 24h window.
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_runs_started_at ON runs(started_at DESC)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_runs_status_started ON runs(status, started_at DESC)")
+            # Per-status run counts for get_stats(), kept current by triggers
+            # so the totals never need a scan; seeded once when first created.
+            seed = not conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE type='table' AND name='run_status_counts'"
+            ).fetchone()
+            conn.execute(
+                """CREATE TABLE IF NOT EXISTS run_status_counts (
+                       status TEXT PRIMARY KEY,
+                       count INTEGER NOT NULL DEFAULT 0
+                   ) WITHOUT ROWID"""
+            )
+            conn.execute(
+                """CREATE TRIGGER IF NOT EXISTS runs_counts_ins AFTER INSERT ON runs BEGIN
+                       INSERT INTO run_status_counts (status, count) VALUES (NEW.status, 1)
+                           ON CONFLICT(status) DO UPDATE SET count = count + 1;
+                   END"""
+            )
+            conn.execute(
+                """CREATE TRIGGER IF NOT EXISTS runs_counts_del AFTER DELETE ON runs BEGIN
+                       UPDATE run_status_counts SET count = count - 1 WHERE status = OLD.status;
+                   END"""
+            )
+            conn.execute(
+                """CREATE TRIGGER IF NOT EXISTS runs_counts_upd AFTER UPDATE OF status ON runs
+                   WHEN OLD.status IS NOT NEW.status BEGIN
+                       UPDATE run_status_counts SET count = count - 1 WHERE status = OLD.status;
+                       INSERT INTO run_status_counts (status, count) VALUES (NEW.status, 1)
+                           ON CONFLICT(status) DO UPDATE SET count = count + 1;
+                   END"""
+            )
+            if seed:
+                conn.execute(
+                    "INSERT INTO run_status_counts (status, count) SELECT status, COUNT(*) FROM runs GROUP BY status"
+                )
 
     def upsert(self, record: RunRecord) -> None:
-        with self._lock, self._connect() as conn:
+        result = record.result
+        stdout = result.get("stdout") if result else None
+        stderr = result.get("stderr") if result else None
+        logged = _logged_streams(record)
+        if result is not None and logged:
+            # The full output of these streams is already on disk: keep only
+            # a preview tail in the row and leave sentinels in the result blob.
+            result = _strip_logs(result, logged)
+            if "stdout" in logged:
+                stdout = _log_tail(stdout)
+            if "stderr" in logged:
+                stderr = _log_tail(stderr)
+        with self._write() as conn:
             conn.execute(
                 """
                 INSERT INTO runs (
                     id, status, started_at, finished_at, request_json,
                     result_json, error, stdout, stderr,
                     correlation_id, run_status, error_summary_json,
-                    visualization_report_json
+                    visualization_report_json, stdout_path, stderr_path
                 )
                 VALUES (
                     :id, :status, :started_at, :finished_at, :request_json,
                     :result_json, :error, :stdout, :stderr,
                     :correlation_id, :run_status, :error_summary_json,
-                    :visualization_report_json
+                    :visualization_report_json, :stdout_path, :stderr_path
                 )
                 ON CONFLICT(id) DO UPDATE SET
                     status=excluded.status,
@@ -187,82 +599,148 @@ class RunStore:
                     request_json=excluded.request_json,
                     result_json=excluded.result_json,
                     error=excluded.error,
-                    stdout=excluded.stdout,
-                    stderr=excluded.stderr,
+                    stdout=COALESCE(excluded.stdout, runs.stdout),
+                    stderr=COALESCE(excluded.stderr, runs.stderr),
                     correlation_id=excluded.correlation_id,
                     run_status=excluded.run_status,
                     error_summary_json=excluded.error_summary_json,
-                    visualization_report_json=excluded.visualization_report_json
+                    visualization_report_json=excluded.visualization_report_json,
+                    stdout_path=excluded.stdout_path,
+                    stderr_path=excluded.stderr_path
                 """,
                 {
                     "id": record.id,
                     "status": record.status,
                     "started_at": record.started_at.isoformat(),
                     "finished_at": record.finished_at.isoformat() if record.finished_at else None,
-                    "request_json": record.request.json(),
-                    "result_json": json.dumps(record.result) if record.result is not None else None,
+                    "request_json": _request_json(record.request),
+                    "result_json": _pack_json(result) if result is not None else None,
                     "error": record.error,
-                    "stdout": record.result.get("stdout") if record.result else None,
-                    "stderr": record.result.get("stderr") if record.result else None,
+                    "stdout": stdout,
+                    "stderr": stderr,
                     "correlation_id": record.correlation_id,
                     "run_status": record.run_status,
-                    "error_summary_json": json.dumps(record.error_summary) if record.error_summary else None,
-                    "visualization_report_json": json.dumps(
+                    "error_summary_json": _json_dumps(record.error_summary) if record.error_summary else None,
+                    "visualization_report_json": _json_dumps(
                         record.result.get("visualization_report")
                     ) if record.result and record.result.get("visualization_report") else None,
+                    "stdout_path": record.stdout_path,
+                    "stderr_path": record.stderr_path,
                 },
             )
-            conn.commit()
+
+    # Columns that ``update_fields`` may touch; names are never taken from
+    # user input, which keeps the f-string SQL below safe.
+    _UPDATABLE_COLS = frozenset({"status", "started_at", "finished_at", "error", "run_status"})
+
+    def update_fields(self, run_id: str, **changes: Any) -> bool:
+        """Update only the given columns of an existing run in one statement."""
+        unknown = set(changes) - self._UPDATABLE_COLS
+        if unknown:
+            raise ValueError(f"Cannot update columns: {sorted(unknown)}")
+        if not changes:
+            return False
+        values = [v.isoformat() if isinstance(v, datetime) else v for v in changes.values()]
+        assignments = ", ".join(f"{col}=?" for col in changes)
+        with self._write() as conn:
+            cursor = conn.execute(
+                f"UPDATE runs SET {assignments} WHERE id = ?",  # noqa: S608
+                values + [run_id],
+            )
+            return cursor.rowcount > 0
 
     def get(self, run_id: str) -> Optional[RunRecord]:
-        with self._connect() as conn:
+        with self._read() as conn:
             row = conn.execute("SELECT * FROM runs WHERE id = ?", (run_id,)).fetchone()
         if not row:
             return None
         return self._row_to_record(row)
 
-    def list(self, limit: int = 50, offset: int = 0, status: Optional[str] = None) -> List[RunRecord]:
-        query = "SELECT * FROM runs"
+    def get_dict(self, run_id: str) -> Optional[Dict[str, Any]]:
+        """Like ``get`` but return the JSON-ready dict without building a RunRecord."""
+        with self._read() as conn:
+            row = conn.execute("SELECT * FROM runs WHERE id = ?", (run_id,)).fetchone()
+        if not row:
+            return None
+        return self._row_to_dict(row)
+
+    # Columns the run listing needs: everything except the result payload
+    # and the log/visualisation columns, which only the per-run endpoints read.
+    _SUMMARY_COLS = (
+        "id, status, started_at, finished_at, request_json, error, "
+        "correlation_id, run_status, error_summary_json"
+    )
+
+    def _list_rows(
+        self, limit: int, offset: int, status: Optional[str], columns: str = "*"
+    ) -> List[sqlite3.Row]:
+        query = f"SELECT {columns} FROM runs"  # noqa: S608 - columns are class constants
         params: List[Any] = []
         if status:
             query += " WHERE status = ?"
             params.append(status)
         query += " ORDER BY started_at DESC LIMIT ? OFFSET ?"
         params.extend([limit, offset])
-        with self._connect() as conn:
-            rows = conn.execute(query, params).fetchall()
-        return [self._row_to_record(row) for row in rows]
+        with self._read() as conn:
+            return conn.execute(query, params).fetchall()
 
-    def _row_to_record(self, row: sqlite3.Row) -> RunRecord:
+    def list(self, limit: int = 50, offset: int = 0, status: Optional[str] = None) -> List[RunRecord]:
+        return [self._row_to_record(row) for row in self._list_rows(limit, offset, status)]
+
+    def list_dicts(self, limit: int = 50, offset: int = 0, status: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Return JSON-ready run summaries; ``result`` is left out (None).
+
+        The full result of a run is served by ``get_dict``.
+        """
+        rows = self._list_rows(limit, offset, status, self._SUMMARY_COLS)
+        return [self._row_to_dict(row) for row in rows]
+
+    def _row_to_dict(self, row: sqlite3.Row) -> Dict[str, Any]:
         keys = row.keys()
         error_summary = None
         if "error_summary_json" in keys and row["error_summary_json"]:
             try:
-                error_summary = json.loads(row["error_summary_json"])
+                error_summary = _json_loads(row["error_summary_json"])
             except Exception:
                 pass
-        return RunRecord(
-            id=row["id"],
-            status=row["status"],
-            started_at=datetime.fromisoformat(row["started_at"]),
-            finished_at=datetime.fromisoformat(row["finished_at"]) if row["finished_at"] else None,
-            request=RunRequest.parse_raw(row["request_json"]),
-            result=json.loads(row["result_json"]) if row["result_json"] else None,
-            error=row["error"],
-            correlation_id=row["correlation_id"] if "correlation_id" in keys else None,
-            run_status=row["run_status"] if "run_status" in keys else None,
-            error_summary=error_summary,
-        )
+        return {
+            "id": row["id"],
+            "status": row["status"],
+            "started_at": row["started_at"],
+            "finished_at": row["finished_at"],
+            "request": _json_loads(row["request_json"]),
+            "result": _unpack_json(row["result_json"]) if "result_json" in keys and row["result_json"] else None,
+            "error": row["error"],
+            "correlation_id": row["correlation_id"] if "correlation_id" in keys else None,
+            "run_status": row["run_status"] if "run_status" in keys else None,
+            "error_summary": error_summary,
+        }
+
+    def _row_to_record(self, row: sqlite3.Row) -> RunRecord:
+        # Rows are only ever written from validated models by this process,
+        # so rebuild them with construct() rather than re-running validation.
+        data = self._row_to_dict(row)
+        keys = row.keys()
+        data["stdout_path"] = row["stdout_path"] if "stdout_path" in keys else None
+        data["stderr_path"] = row["stderr_path"] if "stderr_path" in keys else None
+        data["started_at"] = datetime.fromisoformat(data["started_at"])
+        if data["finished_at"]:
+            data["finished_at"] = datetime.fromisoformat(data["finished_at"])
+        data["request"] = RunRequest.construct(**data["request"])
+        data["request"]._json_cache = row["request_json"]
+        return RunRecord.construct(**data)
 
     def get_logs(self, run_id: str) -> Optional[Dict[str, Optional[str]]]:
-        with self._connect() as conn:
-            row = conn.execute("SELECT stdout, stderr FROM runs WHERE id = ?", (run_id,)).fetchone()
+        with self._read() as conn:
+            row = conn.execute(
+                "SELECT stdout, stderr, stdout_path, stderr_path FROM runs WHERE id = ?", (run_id,)
+            ).fetchone()
         if not row:
             return None
-        return {"stdout": row["stdout"], "stderr": row["stderr"]}
+        return dict(row)
 
     def get_visualization(self, run_id: str) -> Optional[Dict[str, Any]]:
-        with self._connect() as conn:
+        with self._read() as conn:
             row = conn.execute(
                 "SELECT visualization_report_json FROM runs WHERE id = ?", (run_id,)
             ).fetchone()
@@ -272,33 +750,64 @@ class RunStore:
         if not raw:
             return None
         try:
-            return json.loads(raw)
+            return _json_loads(raw)
         except Exception:
             return None
 
     def delete(self, run_id: str) -> bool:
-        with self._lock, self._connect() as conn:
+        with self._write() as conn:
+            row = conn.execute(
+                "SELECT stdout_path, stderr_path FROM runs WHERE id = ?", (run_id,)
+            ).fetchone()
             cursor = conn.execute("DELETE FROM runs WHERE id = ?", (run_id,))
-            conn.commit()
-            return cursor.rowcount > 0
+            deleted = cursor.rowcount > 0
+        if row:
+            _unlink_quietly(row["stdout_path"], row["stderr_path"])
+        return deleted
+
+    def delete_many(self, run_ids: List[str]) -> int:
+        """Delete several runs in one transaction and return how many existed."""
+        deleted = 0
+        log_paths: List[Optional[str]] = []
+        with self._write() as conn:
+            # Stay well below SQLite's bound-parameter limit per statement.
+            for start in range(0, len(run_ids), 500):
+                chunk = run_ids[start:start + 500]
+                placeholders = ",".join("?" * len(chunk))
+                for row in conn.execute(
+                    f"SELECT stdout_path, stderr_path FROM runs WHERE id IN ({placeholders})", chunk  # noqa: S608
+                ):
+                    log_paths.extend((row["stdout_path"], row["stderr_path"]))
+                cursor = conn.execute(f"DELETE FROM runs WHERE id IN ({placeholders})", chunk)  # noqa: S608
+                deleted += cursor.rowcount
+        _unlink_quietly(*log_paths)
+        return deleted
+
+    # A range seek on idx_runs_started_at: only the last day's index entries
+    # are visited, however many older runs the table holds.
+    _RUNS_24H_SQL = "SELECT COUNT(*) FROM runs WHERE started_at > ?"
 
     def get_stats(self) -> Dict[str, Any]:
-        with self._connect() as conn:
-            total = conn.execute("SELECT COUNT(*) FROM runs").fetchone()[0]
-            by_status = dict(conn.execute("SELECT status, COUNT(*) FROM runs GROUP BY status").fetchall())
-            
-            # Last 24h
-            yesterday = (datetime.utcnow().timestamp() - 86400)
-            # SQLite stores dates as strings, so we need to be careful. 
-            # Assuming ISO format YYYY-MM-DD... which sorts correctly as string.
-            yesterday_iso = datetime.fromtimestamp(yesterday).isoformat()
-            last_24h = conn.execute("SELECT COUNT(*) FROM runs WHERE started_at > ?", (yesterday_iso,)).fetchone()[0]
-            
-        return {
-            "total_runs": total,
+        # Dashboards poll this; reuse the last answer until a write lands or
+        # the TTL lapses (the 24h window still moves with the clock).
+        cache = self._stats_cache
+        now = time.monotonic()
+        generation = self._generation
+        if cache["generation"] == generation and now < cache["expires"]:
+            return cache["value"]
+        # started_at is stored as naive UTC ISO text, so the cutoff must be
+        # computed in UTC too for the string comparison to be correct.
+        since = (datetime.utcnow() - timedelta(days=1)).isoformat()
+        with self._read() as conn:
+            by_status = dict(conn.execute("SELECT status, count FROM run_status_counts WHERE count > 0").fetchall())
+            runs_24h = conn.execute(self._RUNS_24H_SQL, (since,)).fetchone()[0]
+        value = {
+            "total_runs": sum(by_status.values()),
             "by_status": by_status,
-            "runs_24h": last_24h
+            "runs_24h": runs_24h,
         }
+        self._stats_cache = {"generation": generation, "expires": now + _STATS_TTL, "value": value}
+        return value
 
 
 # ---------------------------------------------------------------------------
@@ -323,10 +832,94 @@ _EXT_LANG: Dict[str, str] = {
     ".rs": "Rust",
 }
 
+_INDEXABLE_EXTS = frozenset(_EXT_LANG)
+
+# Files written per transaction while scanning a folder root.
+_SCAN_BATCH_SIZE = 500
+_LINE_COUNT_CHUNK = 1024 * 1024
+# Threads counting lines during a scan; reads release the GIL, so threads
+# are enough to overlap the file opens.
+_SCAN_WORKERS = min(32, (os.cpu_count() or 1) * 4)
+
+
+def _iter_files(root: str, recursive: bool) -> Iterator[os.DirEntry]:
+    """Yield a DirEntry for every file under ``root`` (symlinked dirs are not followed)."""
+    stack = [root]
+    while stack:
+        path = stack.pop()
+        try:
+            it = os.scandir(path)
+        except OSError:
+            if path == root:
+                raise  # an unreadable root fails the scan
+            continue
+        with it:
+            for entry in it:
+                try:
+                    if entry.is_file():
+                        yield entry
+                    elif recursive and entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                except OSError:
+                    continue
+
+
+def _count_lines(path: str) -> int:
+    """Count lines like iterating a text file would, without decoding it.
+
+    Universal newlines apply: ``\n``, ``\r\n`` and a lone ``\r`` each end a line.
+    """
+    lines = 0
+    last = b""
+    with open(path, "rb") as f:
+        while True:
+            chunk = f.read(_LINE_COUNT_CHUNK)
+            if not chunk:
+                break
+            lines += chunk.count(b"\n") + chunk.count(b"\r") - chunk.count(b"\r\n")
+            if last.endswith(b"\r") and chunk.startswith(b"\n"):
+                lines -= 1  # a \r\n split across two chunks
+            last = chunk
+    if last and not last.endswith((b"\n", b"\r")):
+        lines += 1  # unterminated final line
+    return lines
+
+
+def _path_pattern_matcher(patterns: List[str]) -> Callable[[str], bool]:
+    """Compile ``Path.match``-style patterns into one predicate over path strings.
+
+    As with ``Path.match``, a relative pattern matches the trailing path
+    components one by one, and an absolute pattern must match them all.
+    """
+    compiled = [
+        (pat.startswith("/"), [re.compile(fnmatch.translate(part)).match for part in pat.split("/") if part])
+        for pat in patterns
+    ]
+
+    def matches(path: str) -> bool:
+        parts = [part for part in path.split(os.sep) if part]
+        for anchored, matchers in compiled:
+            if len(matchers) > len(parts) or (anchored and len(matchers) != len(parts)):
+                continue
+            tail = parts[len(parts) - len(matchers):]
+            if all(match(part) for match, part in zip(matchers, tail)):
+                return True
+        return False
+
+    return matches
+
+
+def _count_lines_quietly(path: str) -> int:
+    try:
+        return _count_lines(path)
+    except OSError:
+        return 0
+
+
 _SCRIPT_STATUSES = frozenset({"draft", "active", "deprecated", "archived"})
 
 
-class ScriptLibrary:
+class ScriptLibrary(_SQLiteStore):
     """SQLite-backed catalog of indexed script files (Script-Manager features).
 
     Tables co-located in the same DB as ``RunStore`` (RUN_DB_PATH) so the
@@ -334,20 +927,21 @@ class ScriptLibrary:
     """
 
     def __init__(self, db_path: Path) -> None:
-        self.db_path = db_path
-        self._lock = threading.Lock()
-        self._scan_status: Dict[int, Dict[str, Any]] = {}  # in-memory scan progress
+        super().__init__(db_path)
+        # In-memory scan progress, shaped like lib_scan_events rows. Entries
+        # are replaced wholesale (never mutated) so readers need no lock.
+        self._scan_status: Dict[int, Dict[str, Any]] = {}
+        self._scan_status_lock = threading.Lock()
         self._ensure_tables()
-
-    def _connect(self) -> sqlite3.Connection:
-        conn = sqlite3.connect(self.db_path, timeout=10)
-        conn.row_factory = sqlite3.Row
-        conn.execute("PRAGMA journal_mode=WAL")
-        return conn
+        # Every table and index now exists, so give the planner statistics
+        # for them up front instead of at the first maintenance pass.
+        self._writer.optimize()
 
     def _ensure_tables(self) -> None:
-        with self._connect() as conn:
-            conn.executescript("""
+        # executescript() manages its own transaction, so it bypasses _write().
+        with self._lock, self._rollback_on_error():
+            self._rw.executescript("""
+                BEGIN IMMEDIATE;
                 CREATE TABLE IF NOT EXISTS lib_folder_roots (
                     id INTEGER PRIMARY KEY AUTOINCREMENT,
                     path TEXT UNIQUE NOT NULL,
@@ -375,6 +969,17 @@ class ScriptLibrary:
                 );
                 CREATE INDEX IF NOT EXISTS idx_lib_scripts_root ON lib_scripts(root_id);
                 CREATE INDEX IF NOT EXISTS idx_lib_scripts_lang ON lib_scripts(language);
+                -- list_scripts filters on missing_flag (+ root or language) and
+                -- orders by name, so these let it read one page in index order.
+                CREATE INDEX IF NOT EXISTS idx_lib_scripts_missing_name ON lib_scripts(missing_flag, name);
+                CREATE INDEX IF NOT EXISTS idx_lib_scripts_missing_root_name
+                    ON lib_scripts(missing_flag, root_id, name);
+                CREATE INDEX IF NOT EXISTS idx_lib_scripts_missing_lang_name
+                    ON lib_scripts(missing_flag, language, name);
+                -- list_duplicates groups live scripts by (name, size, line_count)
+                -- and joins the groups back; partial, so it only holds live rows.
+                CREATE INDEX IF NOT EXISTS idx_lib_scripts_dups
+                    ON lib_scripts(missing_flag, name, size, line_count) WHERE missing_flag = 0;
 
                 CREATE TABLE IF NOT EXISTS lib_tags (
                     id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -409,13 +1014,115 @@ class ScriptLibrary:
                     deleted_count INTEGER DEFAULT 0,
                     error_message TEXT
                 );
+
+                -- Running totals behind get_stats, one row per (metric, key),
+                -- kept current by the triggers below so stats never scan.
+                CREATE TABLE IF NOT EXISTS lib_stats_cache (
+                    metric TEXT NOT NULL,
+                    key TEXT NOT NULL,
+                    value INTEGER NOT NULL DEFAULT 0,
+                    PRIMARY KEY (metric, key)
+                ) WITHOUT ROWID;
+
+                CREATE TRIGGER IF NOT EXISTS lib_scripts_stats_ins AFTER INSERT ON lib_scripts
+                WHEN NEW.missing_flag = 0 BEGIN
+                    UPDATE lib_stats_cache SET value = value + 1 WHERE metric = 'scripts' AND key = '';
+                    INSERT INTO lib_stats_cache (metric, key, value)
+                        SELECT 'lang', NEW.language, 1 WHERE NEW.language IS NOT NULL
+                        ON CONFLICT(metric, key) DO UPDATE SET value = value + 1;
+                    INSERT INTO lib_stats_cache (metric, key, value)
+                        SELECT 'status', COALESCE((SELECT status FROM lib_script_status
+                                                   WHERE script_id = NEW.id), 'active'), 1 WHERE 1
+                        ON CONFLICT(metric, key) DO UPDATE SET value = value + 1;
+                END;
+
+                CREATE TRIGGER IF NOT EXISTS lib_scripts_stats_del BEFORE DELETE ON lib_scripts
+                WHEN OLD.missing_flag = 0 BEGIN
+                    UPDATE lib_stats_cache SET value = value - 1 WHERE metric = 'scripts' AND key = '';
+                    UPDATE lib_stats_cache SET value = value - 1 WHERE metric = 'lang' AND key = OLD.language;
+                    UPDATE lib_stats_cache SET value = value - 1 WHERE metric = 'status'
+                        AND key = COALESCE((SELECT status FROM lib_script_status
+                                            WHERE script_id = OLD.id), 'active');
+                END;
+
+                CREATE TRIGGER IF NOT EXISTS lib_scripts_stats_upd AFTER UPDATE OF missing_flag, language ON lib_scripts
+                WHEN OLD.missing_flag IS NOT NEW.missing_flag OR OLD.language IS NOT NEW.language BEGIN
+                    UPDATE lib_stats_cache SET value = value + (NEW.missing_flag = 0) - (OLD.missing_flag = 0)
+                        WHERE metric = 'scripts' AND key = '';
+                    UPDATE lib_stats_cache SET value = value - 1
+                        WHERE metric = 'lang' AND key = OLD.language AND OLD.missing_flag = 0;
+                    INSERT INTO lib_stats_cache (metric, key, value)
+                        SELECT 'lang', NEW.language, 1 WHERE NEW.language IS NOT NULL AND NEW.missing_flag = 0
+                        ON CONFLICT(metric, key) DO UPDATE SET value = value + 1;
+                    INSERT INTO lib_stats_cache (metric, key, value)
+                        SELECT 'status', COALESCE((SELECT status FROM lib_script_status
+                                                   WHERE script_id = NEW.id), 'active'),
+                               (NEW.missing_flag = 0) - (OLD.missing_flag = 0)
+                        WHERE OLD.missing_flag IS NOT NEW.missing_flag
+                        ON CONFLICT(metric, key) DO UPDATE SET value = value + excluded.value;
+                END;
+
+                -- A lifecycle status only counts while its script is live.
+                CREATE TRIGGER IF NOT EXISTS lib_script_status_stats_ins AFTER INSERT ON lib_script_status
+                WHEN EXISTS (SELECT 1 FROM lib_scripts WHERE id = NEW.script_id AND missing_flag = 0) BEGIN
+                    UPDATE lib_stats_cache SET value = value - 1 WHERE metric = 'status' AND key = 'active';
+                    INSERT INTO lib_stats_cache (metric, key, value)
+                        SELECT 'status', COALESCE(NEW.status, 'active'), 1 WHERE 1
+                        ON CONFLICT(metric, key) DO UPDATE SET value = value + 1;
+                END;
+
+                CREATE TRIGGER IF NOT EXISTS lib_script_status_stats_upd AFTER UPDATE OF status ON lib_script_status
+                WHEN OLD.status IS NOT NEW.status
+                    AND EXISTS (SELECT 1 FROM lib_scripts WHERE id = NEW.script_id AND missing_flag = 0) BEGIN
+                    UPDATE lib_stats_cache SET value = value - 1
+                        WHERE metric = 'status' AND key = COALESCE(OLD.status, 'active');
+                    INSERT INTO lib_stats_cache (metric, key, value)
+                        SELECT 'status', COALESCE(NEW.status, 'active'), 1 WHERE 1
+                        ON CONFLICT(metric, key) DO UPDATE SET value = value + 1;
+                END;
+
+                CREATE TRIGGER IF NOT EXISTS lib_script_status_stats_del AFTER DELETE ON lib_script_status
+                WHEN EXISTS (SELECT 1 FROM lib_scripts WHERE id = OLD.script_id AND missing_flag = 0) BEGIN
+                    UPDATE lib_stats_cache SET value = value - 1
+                        WHERE metric = 'status' AND key = COALESCE(OLD.status, 'active');
+                    INSERT INTO lib_stats_cache (metric, key, value) VALUES ('status', 'active', 1)
+                        ON CONFLICT(metric, key) DO UPDATE SET value = value + 1;
+                END;
+
+                CREATE TRIGGER IF NOT EXISTS lib_tags_stats_ins AFTER INSERT ON lib_tags BEGIN
+                    UPDATE lib_stats_cache SET value = value + 1 WHERE metric = 'tags' AND key = '';
+                END;
+                CREATE TRIGGER IF NOT EXISTS lib_tags_stats_del AFTER DELETE ON lib_tags BEGIN
+                    UPDATE lib_stats_cache SET value = value - 1 WHERE metric = 'tags' AND key = '';
+                END;
+                CREATE TRIGGER IF NOT EXISTS lib_folder_roots_stats_ins AFTER INSERT ON lib_folder_roots BEGIN
+                    UPDATE lib_stats_cache SET value = value + 1 WHERE metric = 'roots' AND key = '';
+                END;
+                CREATE TRIGGER IF NOT EXISTS lib_folder_roots_stats_del AFTER DELETE ON lib_folder_roots BEGIN
+                    UPDATE lib_stats_cache SET value = value - 1 WHERE metric = 'roots' AND key = '';
+                END;
+
+                -- Seed the totals once, for new databases and ones created
+                -- before the cache existed.
+                INSERT INTO lib_stats_cache (metric, key, value)
+                    SELECT * FROM (
+                        SELECT 'scripts', '', (SELECT COUNT(*) FROM lib_scripts WHERE missing_flag = 0)
+                        UNION ALL SELECT 'tags', '', (SELECT COUNT(*) FROM lib_tags)
+                        UNION ALL SELECT 'roots', '', (SELECT COUNT(*) FROM lib_folder_roots)
+                        UNION ALL SELECT 'lang', language, COUNT(*) FROM lib_scripts
+                            WHERE missing_flag = 0 AND language IS NOT NULL GROUP BY language
+                        UNION ALL SELECT 'status', COALESCE(ss.status, 'active'), COUNT(*)
+                            FROM lib_scripts s LEFT JOIN lib_script_status ss ON s.id = ss.script_id
+                            WHERE s.missing_flag = 0 GROUP BY 2
+                    )
+                    WHERE NOT EXISTS (SELECT 1 FROM lib_stats_cache);
+                COMMIT;
             """)
-            conn.commit()
 
     # ---- Folder Roots ----
 
     def list_folder_roots(self) -> List[Dict[str, Any]]:
-        with self._connect() as conn:
+        with self._read() as conn:
             rows = conn.execute(
                 "SELECT * FROM lib_folder_roots ORDER BY name"
             ).fetchall()
@@ -426,21 +1133,20 @@ class ScriptLibrary:
         abs_path = str(Path(path).resolve())
         if not Path(abs_path).is_dir():
             raise ValueError(f"Path does not exist or is not a directory: {abs_path}")
-        with self._lock, self._connect() as conn:
+        with self._write() as conn:
             try:
                 cursor = conn.execute(
                     """INSERT INTO lib_folder_roots (path, name, recursive, include_patterns, exclude_patterns)
                        VALUES (?, ?, ?, ?, ?)""",
                     (abs_path, name, int(recursive), include_patterns, exclude_patterns),
                 )
-                conn.commit()
                 root_id = cursor.lastrowid
             except sqlite3.IntegrityError as exc:
                 raise ValueError("Folder root with this path already exists") from exc
         return self._get_folder_root(root_id)
 
     def _get_folder_root(self, root_id: int) -> Dict[str, Any]:
-        with self._connect() as conn:
+        with self._read() as conn:
             row = conn.execute("SELECT * FROM lib_folder_roots WHERE id = ?", (root_id,)).fetchone()
         if not row:
             raise KeyError(f"Folder root {root_id} not found")
@@ -453,9 +1159,8 @@ class ScriptLibrary:
             return None
 
     def delete_folder_root(self, root_id: int) -> bool:
-        with self._lock, self._connect() as conn:
+        with self._write() as conn:
             cursor = conn.execute("DELETE FROM lib_folder_roots WHERE id = ?", (root_id,))
-            conn.commit()
             return cursor.rowcount > 0
 
     # ---- Scanning ----
@@ -466,95 +1171,156 @@ class ScriptLibrary:
         if not root:
             raise KeyError(f"Folder root {root_id} not found")
         started_at = datetime.utcnow().isoformat()
-        with self._lock, self._connect() as conn:
+        with self._write() as conn:
             cursor = conn.execute(
                 "INSERT INTO lib_scan_events (root_id, started_at, status) VALUES (?, ?, 'running')",
                 (root_id, started_at),
             )
-            conn.commit()
             scan_id = cursor.lastrowid
-        self._scan_status[scan_id] = {"status": "running", "progress": 0}
+        self._scan_status[scan_id] = {
+            "id": scan_id, "root_id": root_id, "started_at": started_at, "ended_at": None,
+            "status": "running", "new_count": 0, "updated_count": 0, "deleted_count": 0,
+            "error_message": None, "files_scanned": 0,
+        }
         t = threading.Thread(target=self._do_scan, args=(root, scan_id), daemon=True)
         t.start()
         return scan_id
 
     def _do_scan(self, root: Dict[str, Any], scan_id: int) -> None:
         root_id = root["id"]
-        root_path = Path(root["path"])
+        root_path: str = root["path"]
         recursive: bool = bool(root.get("recursive", 1))
         include_raw: str = root.get("include_patterns", "") or ""
         exclude_raw: str = root.get("exclude_patterns", "") or ""
         include_exts = {p.strip().lower() for p in include_raw.split(",") if p.strip()} if include_raw else set()
         exclude_patterns = [p.strip() for p in exclude_raw.split(",") if p.strip()]
+        # Only known extensions are indexed; include patterns can narrow that.
+        allowed_exts = _INDEXABLE_EXTS & include_exts if include_exts else _INDEXABLE_EXTS
+        # Slash-free patterns only ever match the file name (as Path.match
+        # would), so they collapse into one precompiled regex.
+        name_patterns = [p for p in exclude_patterns if "/" not in p]
+        path_patterns = [p for p in exclude_patterns if "/" in p]
+        excluded_path = _path_pattern_matcher(path_patterns) if path_patterns else None
+        excluded_name = (
+            re.compile("|".join(fnmatch.translate(p) for p in name_patterns)).match
+            if name_patterns else None
+        )
+        lang_for = _EXT_LANG.get
 
         new_count = updated_count = deleted_count = 0
+        inserts: List[tuple] = []
+        updates: List[tuple] = []
+        revived: List[tuple] = []
+        # (line-count future, (path, name, ext, lang, size, mtime), existing id or None)
+        pending: List[tuple] = []
+
+        def flush() -> None:
+            for future, meta, script_id in pending:
+                if script_id is None:
+                    inserts.append((root_id,) + meta + (future.result(),))
+                else:
+                    updates.append(meta[1:] + (future.result(), script_id))
+            pending.clear()
+            if not (inserts or updates or revived):
+                return
+            with self._write() as conn:
+                # A path already indexed under another (overlapping) root is
+                # refreshed in place rather than violating UNIQUE(path).
+                conn.executemany(
+                    """INSERT INTO lib_scripts (root_id, path, name, extension, language, size, mtime, line_count)
+                       VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                       ON CONFLICT(path) DO UPDATE SET name=excluded.name, extension=excluded.extension,
+                           language=excluded.language, size=excluded.size, mtime=excluded.mtime,
+                           line_count=excluded.line_count, missing_flag=0, updated_at=datetime('now')""",
+                    inserts,
+                )
+                conn.executemany(
+                    """UPDATE lib_scripts SET name=?, extension=?, language=?, size=?,
+                       mtime=?, line_count=?, missing_flag=0, updated_at=datetime('now')
+                       WHERE id=?""",
+                    updates,
+                )
+                conn.executemany("UPDATE lib_scripts SET missing_flag=0 WHERE id=?", revived)
+            inserts.clear()
+            updates.clear()
+            revived.clear()
+
         try:
-            walker = root_path.rglob("*") if recursive else root_path.glob("*")
             scanned_paths: set = set()
+            # Every path the walk can yield starts with the root's prefix, so a
+            # range over the UNIQUE(path) index also finds files already
+            # indexed under another, overlapping root.
+            prefix = os.path.join(os.path.abspath(root_path), "")
+            with self._read() as conn:
+                known = {
+                    row["path"]: row
+                    for row in conn.execute(
+                        "SELECT id, root_id, path, mtime, missing_flag FROM lib_scripts"
+                        " WHERE root_id = ? OR (path >= ? AND path < ?)",
+                        (root_id, prefix, prefix[:-1] + chr(ord(prefix[-1]) + 1)),
+                    )
+                }
 
-            for fpath in walker:
-                if not fpath.is_file():
-                    continue
-                ext = fpath.suffix.lower()
-                if include_exts and ext not in include_exts:
-                    continue
-                if any(fpath.match(pat) for pat in exclude_patterns):
-                    continue
-                # Only accepted extensions (Python files must always be indexable)
-                if ext not in _EXT_LANG and ext not in {".py", ".pyw"}:
-                    continue
+            with ThreadPoolExecutor(max_workers=_SCAN_WORKERS) as pool:
+                for entry in _iter_files(root_path, recursive):
+                    ext = os.path.splitext(entry.name)[1].lower()
+                    if ext not in allowed_exts:
+                        continue
+                    if excluded_name is not None and excluded_name(entry.name):
+                        continue
+                    if excluded_path is not None and excluded_path(entry.path):
+                        continue
 
-                lang = _EXT_LANG.get(ext)
-                try:
-                    stat = fpath.stat()
-                    size = stat.st_size
-                    mtime = datetime.fromtimestamp(stat.st_mtime).isoformat()
-                    line_count = 0
+                    lang = lang_for(ext)
                     try:
-                        with open(fpath, "r", encoding="utf-8", errors="replace") as f:
-                            line_count = sum(1 for _ in f)
+                        stat = entry.stat()
                     except OSError:
-                        pass
-                except OSError:
-                    continue
+                        continue
+                    size = stat.st_size
+                    mtime = datetime.fromtimestamp(stat.st_mtime).isoformat()
 
-                abs_str = str(fpath.resolve())
-                scanned_paths.add(abs_str)
+                    abs_str = os.path.abspath(entry.path)
+                    scanned_paths.add(abs_str)
 
-                with self._lock, self._connect() as conn:
-                    existing = conn.execute(
-                        "SELECT id, mtime FROM lib_scripts WHERE path = ?", (abs_str,)
-                    ).fetchone()
+                    # Unchanged files keep their stored line count; only new or
+                    # modified ones are read, on the pool so the opens overlap.
+                    existing = known.get(abs_str)
                     if existing:
                         if existing["mtime"] != mtime:
-                            conn.execute(
-                                """UPDATE lib_scripts SET name=?, extension=?, language=?, size=?,
-                                   mtime=?, line_count=?, missing_flag=0, updated_at=datetime('now')
-                                   WHERE id=?""",
-                                (fpath.name, ext, lang, size, mtime, line_count, existing["id"]),
-                            )
                             updated_count += 1
                         else:
-                            conn.execute("UPDATE lib_scripts SET missing_flag=0 WHERE id=?", (existing["id"],))
+                            if existing["missing_flag"]:
+                                revived.append((existing["id"],))
+                            continue
                     else:
-                        conn.execute(
-                            """INSERT INTO lib_scripts (root_id, path, name, extension, language, size, mtime, line_count)
-                               VALUES (?, ?, ?, ?, ?, ?, ?, ?)""",
-                            (root_id, abs_str, fpath.name, ext, lang, size, mtime, line_count),
-                        )
                         new_count += 1
-                    conn.commit()
-
-            # Mark deleted
-            with self._lock, self._connect() as conn:
-                rows = conn.execute(
-                    "SELECT id, path FROM lib_scripts WHERE root_id = ? AND missing_flag = 0",
-                    (root_id,),
-                ).fetchall()
-                for row in rows:
-                    if row["path"] not in scanned_paths:
-                        conn.execute("UPDATE lib_scripts SET missing_flag=1 WHERE id=?", (row["id"],))
-                        deleted_count += 1
+                    pending.append((
+                        pool.submit(_count_lines_quietly, entry.path),
+                        (abs_str, entry.name, ext, lang, size, mtime),
+                        existing["id"] if existing else None,
+                    ))
+                    if len(pending) + len(revived) >= _SCAN_BATCH_SIZE:
+                        flush()
+                        self._update_scan_status(
+                            scan_id, files_scanned=len(scanned_paths),
+                            new_count=new_count, updated_count=updated_count,
+                        )
+                flush()
+
+            # Mark deleted: this root's rows known before the walk that it
+            # did not see.
+            missing_ids = [
+                row["id"] for path, row in known.items()
+                if row["root_id"] == root_id and not row["missing_flag"] and path not in scanned_paths
+            ]
+            deleted_count = len(missing_ids)
+            with self._write() as conn:
+                for start in range(0, len(missing_ids), 500):
+                    chunk = missing_ids[start:start + 500]
+                    placeholders = ",".join("?" * len(chunk))
+                    conn.execute(
+                        f"UPDATE lib_scripts SET missing_flag=1 WHERE id IN ({placeholders})", chunk  # noqa: S608
+                    )
                 ended_at = datetime.utcnow().isoformat()
                 conn.execute(
                     """UPDATE lib_scan_events SET ended_at=?, status='completed',
@@ -565,25 +1331,32 @@ class ScriptLibrary:
                     "UPDATE lib_folder_roots SET last_scan_at=? WHERE id=?",
                     (ended_at, root_id),
                 )
-                conn.commit()
 
-            self._scan_status[scan_id] = {
-                "status": "completed", "new": new_count,
-                "updated": updated_count, "deleted": deleted_count,
-            }
+            self._update_scan_status(
+                scan_id, status="completed", ended_at=ended_at, files_scanned=len(scanned_paths),
+                new_count=new_count, updated_count=updated_count, deleted_count=deleted_count,
+            )
 
         except Exception as exc:
             ended_at = datetime.utcnow().isoformat()
-            with self._connect() as conn:
+            with self._write() as conn:
                 conn.execute(
                     "UPDATE lib_scan_events SET ended_at=?, status='failed', error_message=? WHERE id=?",
                     (ended_at, str(exc), scan_id),
                 )
-                conn.commit()
-            self._scan_status[scan_id] = {"status": "failed", "error": str(exc)}
+            self._update_scan_status(scan_id, status="failed", ended_at=ended_at, error_message=str(exc))
+
+    def _update_scan_status(self, scan_id: int, **fields: Any) -> None:
+        with self._scan_status_lock:
+            self._scan_status[scan_id] = {**self._scan_status.get(scan_id, {}), **fields}
 
     def get_scan_status(self, scan_id: int) -> Optional[Dict[str, Any]]:
-        with self._connect() as conn:
+        # Scans started by this process are answered from memory; the table
+        # is only consulted for scans from before a restart.
+        status = self._scan_status.get(scan_id)
+        if status is not None:
+            return dict(status)
+        with self._read() as conn:
             row = conn.execute("SELECT * FROM lib_scan_events WHERE id=?", (scan_id,)).fetchone()
         return dict(row) if row else None
 
@@ -618,7 +1391,7 @@ class ScriptLibrary:
             params.append(tag)
 
         where = " AND ".join(conditions)
-        with self._connect() as conn:
+        with self._read() as conn:
             total = conn.execute(
                 f"SELECT COUNT(*) FROM lib_scripts s LEFT JOIN lib_script_status ss ON s.id=ss.script_id WHERE {where}",
                 params,
@@ -626,28 +1399,34 @@ class ScriptLibrary:
             offset = (page - 1) * page_size
             rows = conn.execute(
                 f"""SELECT s.*, COALESCE(ss.status,'active') as lifecycle_status,
-                           ss.owner, ss.environment,
-                           GROUP_CONCAT(t.name,'|') as tags
+                           ss.owner, ss.environment
                     FROM lib_scripts s
                     LEFT JOIN lib_script_status ss ON s.id=ss.script_id
-                    LEFT JOIN lib_script_tags lst ON s.id=lst.script_id
-                    LEFT JOIN lib_tags t ON lst.tag_id=t.id
                     WHERE {where}
-                    GROUP BY s.id
                     ORDER BY s.name ASC
                     LIMIT ? OFFSET ?""",
                 params + [page_size, offset],
             ).fetchall()
-        items = []
-        for row in rows:
-            d = dict(row)
-            d["tags"] = [t for t in (d.get("tags") or "").split("|") if t]
-            items.append(d)
+            items = [dict(row) for row in rows]
+            # Tags for just this page, fetched by primary key instead of
+            # joining and aggregating them for every matching script.
+            tags_by_id: Dict[int, List[str]] = {d["id"]: [] for d in items}
+            if tags_by_id:
+                placeholders = ",".join("?" * len(tags_by_id))
+                for script_id, tag_name in conn.execute(
+                    f"""SELECT lst.script_id, t.name FROM lib_script_tags lst
+                        JOIN lib_tags t ON lst.tag_id=t.id
+                        WHERE lst.script_id IN ({placeholders})""",
+                    list(tags_by_id),
+                ):
+                    tags_by_id[script_id].append(tag_name)
+        for d in items:
+            d["tags"] = tags_by_id[d["id"]]
         return {"items": items, "total": total, "page": page, "page_size": page_size,
                 "total_pages": max(1, (total + page_size - 1) // page_size)}
 
     def get_script(self, script_id: int) -> Optional[Dict[str, Any]]:
-        with self._connect() as conn:
+        with self._read() as conn:
             row = conn.execute("SELECT * FROM lib_scripts WHERE id=?", (script_id,)).fetchone()
             if not row:
                 return None
@@ -664,59 +1443,48 @@ class ScriptLibrary:
         return d
 
     def get_script_content(self, script_id: int) -> Optional[str]:
-        with self._connect() as conn:
+        with self._read() as conn:
             row = conn.execute("SELECT path FROM lib_scripts WHERE id=?", (script_id,)).fetchone()
         if not row:
             return None
-        path = Path(row["path"])
-        if not path.is_file():
-            return None
         try:
-            return path.read_text(encoding="utf-8", errors="replace")
-        except OSError:
+            return Path(row["path"]).read_text(encoding="utf-8", errors="replace")
+        except OSError:  # missing, a directory, or unreadable
             return None
 
     def update_script_status(self, script_id: int, status: Optional[str] = None,
                               owner: Optional[str] = None, environment: Optional[str] = None,
                               notes: Optional[str] = None) -> bool:
-        with self._connect() as conn:
-            row = conn.execute("SELECT id FROM lib_scripts WHERE id=?", (script_id,)).fetchone()
-        if not row:
-            return False
-        with self._lock, self._connect() as conn:
-            existing = conn.execute("SELECT script_id FROM lib_script_status WHERE script_id=?", (script_id,)).fetchone()
-            if existing:
-                updates = []
-                vals: List[Any] = []
-                if status is not None:
-                    updates.append("status=?"); vals.append(status)
-                if owner is not None:
-                    updates.append("owner=?"); vals.append(owner)
-                if environment is not None:
-                    updates.append("environment=?"); vals.append(environment)
-                if notes is not None:
-                    updates.append("notes=?"); vals.append(notes)
-                if updates:
-                    updates.append("updated_at=datetime('now')")
-                    vals.append(script_id)
-                    conn.execute(f"UPDATE lib_script_status SET {', '.join(updates)} WHERE script_id=?", vals)
-            else:
-                conn.execute(
-                    "INSERT INTO lib_script_status (script_id, status, owner, environment, notes) VALUES (?,?,?,?,?)",
-                    (script_id, status or "active", owner, environment, notes),
-                )
-            conn.commit()
+        params = {"script_id": script_id, "status": status, "owner": owner,
+                  "environment": environment, "notes": notes}
+        with self._write() as conn:
+            if not conn.execute("SELECT 1 FROM lib_scripts WHERE id=?", (script_id,)).fetchone():
+                return False
+            # Fields passed as None keep their stored value; a call with no
+            # fields at all leaves an existing row untouched.
+            conn.execute(
+                """INSERT INTO lib_script_status (script_id, status, owner, environment, notes)
+                   VALUES (:script_id, COALESCE(:status, 'active'), :owner, :environment, :notes)
+                   ON CONFLICT(script_id) DO UPDATE SET
+                       status=COALESCE(:status, status),
+                       owner=COALESCE(:owner, owner),
+                       environment=COALESCE(:environment, environment),
+                       notes=COALESCE(:notes, notes),
+                       updated_at=datetime('now')
+                   WHERE COALESCE(:status, :owner, :environment, :notes) IS NOT NULL""",
+                params,
+            )
         return True
 
     def get_script_notes(self, script_id: int) -> Optional[str]:
-        with self._connect() as conn:
+        with self._read() as conn:
             row = conn.execute("SELECT notes FROM lib_script_status WHERE script_id=?", (script_id,)).fetchone()
         return row["notes"] if row else None
 
     # ---- Tags ----
 
     def list_tags(self) -> List[Dict[str, Any]]:
-        with self._connect() as conn:
+        with self._read() as conn:
             rows = conn.execute(
                 """SELECT t.*, COUNT(lst.script_id) as script_count
                    FROM lib_tags t LEFT JOIN lib_script_tags lst ON t.id=lst.tag_id
@@ -725,102 +1493,150 @@ class ScriptLibrary:
         return [dict(r) for r in rows]
 
     def create_tag(self, name: str, color: str = "#6366f1") -> Dict[str, Any]:
-        with self._lock, self._connect() as conn:
+        with self._write() as conn:
             try:
                 cursor = conn.execute("INSERT INTO lib_tags (name, color) VALUES (?, ?)", (name, color))
-                conn.commit()
                 tag_id = cursor.lastrowid
             except sqlite3.IntegrityError as exc:
                 raise ValueError("Tag with this name already exists") from exc
-        with self._connect() as conn:
+        with self._read() as conn:
             row = conn.execute("SELECT * FROM lib_tags WHERE id=?", (tag_id,)).fetchone()
         return dict(row)
 
     def delete_tag(self, tag_id: int) -> bool:
-        with self._lock, self._connect() as conn:
+        with self._write() as conn:
             cursor = conn.execute("DELETE FROM lib_tags WHERE id=?", (tag_id,))
-            conn.commit()
             return cursor.rowcount > 0
 
     def add_tag_to_script(self, script_id: int, tag_id: int) -> bool:
-        with self._lock, self._connect() as conn:
+        with self._write() as conn:
             try:
                 conn.execute("INSERT INTO lib_script_tags (script_id, tag_id) VALUES (?, ?)", (script_id, tag_id))
-                conn.commit()
                 return True
             except sqlite3.IntegrityError:
                 return False  # already tagged
 
     def remove_tag_from_script(self, script_id: int, tag_id: int) -> bool:
-        with self._lock, self._connect() as conn:
+        with self._write() as conn:
             cursor = conn.execute("DELETE FROM lib_script_tags WHERE script_id=? AND tag_id=?", (script_id, tag_id))
-            conn.commit()
             return cursor.rowcount > 0
 
     # ---- Duplicates ----
 
     def list_duplicates(self) -> List[Dict[str, Any]]:
         """Return groups of scripts with identical content (same size+line_count+name heuristic)."""
-        with self._connect() as conn:
+        # Join each duplicate group back to its rows rather than packing the
+        # paths into one GROUP_CONCAT string and splitting it apart again.
+        with self._read() as conn:
             rows = conn.execute(
-                """SELECT name, size, line_count, COUNT(*) as count,
-                          GROUP_CONCAT(path, '||') as paths,
-                          GROUP_CONCAT(id, '||') as ids
-                   FROM lib_scripts
-                   WHERE missing_flag = 0 AND size > 0
-                   GROUP BY name, size, line_count
-                   HAVING count > 1
-                   ORDER BY count DESC""",
+                """SELECT s.id, s.path, s.name, s.size, s.line_count, d.count
+                   FROM lib_scripts s
+                   JOIN (SELECT name, size, line_count, COUNT(*) as count
+                         FROM lib_scripts
+                         WHERE missing_flag = 0 AND size > 0
+                         GROUP BY name, size, line_count
+                         HAVING count > 1) d
+                     ON s.name = d.name AND s.size = d.size AND s.line_count = d.line_count
+                   WHERE s.missing_flag = 0
+                   ORDER BY d.count DESC, s.name, s.size, s.line_count, s.id""",
             ).fetchall()
-        result = []
-        for row in rows:
-            result.append({
-                "name": row["name"],
-                "size": row["size"],
-                "line_count": row["line_count"],
-                "count": row["count"],
-                "paths": row["paths"].split("||") if row["paths"] else [],
-                "ids": [int(i) for i in row["ids"].split("||")] if row["ids"] else [],
+        # Rows arrive ordered group by group, so each group is one consecutive
+        # run; unpack them positionally instead of by column name.
+        groups: List[Dict[str, Any]] = []
+        for (name, size, line_count, count), members in groupby(rows, key=itemgetter(2, 3, 4, 5)):
+            ids, paths = zip(*(member[:2] for member in members))
+            groups.append({
+                "name": name,
+                "size": size,
+                "line_count": line_count,
+                "count": count,
+                "paths": list(paths),
+                "ids": list(ids),
             })
-        return result
+        return groups
 
     # ---- Library stats ----
 
     def get_stats(self) -> Dict[str, Any]:
-        with self._connect() as conn:
-            total = conn.execute("SELECT COUNT(*) FROM lib_scripts WHERE missing_flag=0").fetchone()[0]
-            by_lang_rows = conn.execute(
-                "SELECT language, COUNT(*) FROM lib_scripts WHERE missing_flag=0 AND language IS NOT NULL GROUP BY language ORDER BY 2 DESC"
-            ).fetchall()
-            by_status_rows = conn.execute(
-                """SELECT COALESCE(ss.status,'active'), COUNT(*)
-                   FROM lib_scripts s LEFT JOIN lib_script_status ss ON s.id=ss.script_id
-                   WHERE s.missing_flag=0 GROUP BY 1"""
+        # Served from the trigger-maintained lib_stats_cache rather than
+        # aggregating lib_scripts on every call.
+        with self._read() as conn:
+            rows = conn.execute(
+                "SELECT metric, key, value FROM lib_stats_cache ORDER BY metric, value DESC, key"
             ).fetchall()
-            total_tags = conn.execute("SELECT COUNT(*) FROM lib_tags").fetchone()[0]
-            total_roots = conn.execute("SELECT COUNT(*) FROM lib_folder_roots").fetchone()[0]
+        totals: Dict[str, int] = {}
+        by_metric: Dict[str, Dict[str, int]] = {"lang": {}, "status": {}}
+        for metric, key, value in rows:
+            if metric in by_metric:
+                if value > 0:
+                    by_metric[metric][key] = value
+            else:
+                totals[metric] = value
         return {
-            "total_scripts": total,
-            "by_language": dict(by_lang_rows),
-            "by_lifecycle_status": dict(by_status_rows),
-            "total_tags": total_tags,
-            "total_roots": total_roots,
+            "total_scripts": totals.get("scripts", 0),
+            "by_language": by_metric["lang"],
+            "by_lifecycle_status": by_metric["status"],
+            "total_tags": totals.get("tags", 0),
+            "total_roots": totals.get("roots", 0),
         }
 
 
-app = FastAPI(title="Script Runner Web API", version="1.4.0")
+app = FastAPI(title="Script Runner Web API", version="1.4.0", default_response_class=ORJSONResponse)
+
+
+class _LRUCache(OrderedDict):
+    """Dict bounded to ``maxsize`` entries that evicts the least recently used."""
+
+    def __init__(self, maxsize: int) -> None:
+        super().__init__()
+        self.maxsize = maxsize
+
+    def __getitem__(self, key: Any) -> Any:
+        value = super().__getitem__(key)
+        self.move_to_end(key)
+        return value
+
+    def get(self, key: Any, default: Any = None) -> Any:
+        if key in self:
+            return self[key]
+        return default
+
+    def __setitem__(self, key: Any, value: Any) -> None:
+        super().__setitem__(key, value)
+        self.move_to_end(key)
+        if len(self) > self.maxsize:
+            self._evict()
+
+    def _evict(self) -> None:
+        self.popitem(last=False)
+
+
+class _RunCache(_LRUCache):
+    """LRU of run records that never evicts a queued or running run.
+
+    Active runs are bounded by ``_RUN_SLOTS``, so pinning them can only
+    push the cache past ``maxsize`` by that many entries.
+    """
+
+    def _evict(self) -> None:
+        for run_id, record in self.items():
+            if record.status not in {"queued", "running"}:
+                self.pop(run_id)
+                return
+
 
-RUNS: Dict[str, RunRecord] = {}
+# Hot cache of recent runs; anything evicted is still served from RUN_STORE.
+_RUNS_CACHE_SIZE = 256
+RUNS: Dict[str, RunRecord] = _RunCache(maxsize=_RUNS_CACHE_SIZE)
+# Guards RUNS (even reads reorder the LRU). RUN_HANDLES is only ever touched
+# by single get/set/pop calls on a plain dict, which are atomic, so it needs
+# no lock.
 RUNS_LOCK = threading.Lock()
 # RUN_HANDLES stores: {"cancel_event": Event, "runner": ScriptRunner|None}
 RUN_HANDLES: Dict[str, Dict[str, Any]] = {}
 RUN_STORE = RunStore(RUN_DB_PATH)
 SCRIPT_LIBRARY = ScriptLibrary(RUN_DB_PATH)
 
-with RUNS_LOCK:
-    for record in RUN_STORE.list(limit=200):
-        RUNS[record.id] = record
-
 
 @app.get("/api/health")
 def health() -> Dict[str, str]:
@@ -829,42 +1645,62 @@ def health() -> Dict[str, str]:
     return {"status": "ok"}
 
 
-@app.get("/api/system/status")
-def system_status() -> Dict[str, Any]:
-    """Return system resource usage."""
-    status = {"cpu_load": [0.0, 0.0, 0.0], "memory": {"total": 0, "available": 0}}
-    
+_MEMINFO_TOTAL_RE = re.compile(rb"^MemTotal:\s+(\d+)", re.M)
+_MEMINFO_AVAILABLE_RE = re.compile(rb"^MemAvailable:\s+(\d+)", re.M)
+# Dashboards poll this endpoint every few seconds; reuse a snapshot this young.
+_SYSTEM_STATUS_TTL = 1.0
+_system_status_cache: Dict[str, Any] = {"expires": 0.0, "value": None}
+# /proc/meminfo is regenerated on every read, so one descriptor opened on
+# first use is re-read with pread() instead of reopening the file each time.
+_meminfo_fd: Optional[int] = None
+
+
+def _read_meminfo() -> bytes:
+    global _meminfo_fd
+    if _meminfo_fd is None:
+        _meminfo_fd = os.open("/proc/meminfo", os.O_RDONLY)
+    return os.pread(_meminfo_fd, 8192, 0)
+
+
+def _read_system_status() -> Dict[str, Any]:
+    status: Dict[str, Any] = {"cpu_load": [0.0, 0.0, 0.0], "memory": {"total": 0, "available": 0}}
+
     # CPU Load
     if hasattr(os, "getloadavg"):
         status["cpu_load"] = list(os.getloadavg())
-    
+
     # Memory (Linux only)
-    if Path("/proc/meminfo").exists():
-        try:
-            mem_info = {}
-            with open("/proc/meminfo", "r") as f:
-                for line in f:
-                    parts = line.split(":")
-                    if len(parts) == 2:
-                        key = parts[0].strip()
-                        val = parts[1].strip().split()[0] # kB
-                        mem_info[key] = int(val) * 1024 # bytes
-            
-            if "MemTotal" in mem_info and "MemAvailable" in mem_info:
-                status["memory"] = {
-                    "total": mem_info["MemTotal"],
-                    "available": mem_info["MemAvailable"],
-                    "percent": round((1 - mem_info["MemAvailable"] / mem_info["MemTotal"]) * 100, 1)
-                }
-        except Exception:
-            pass
-            
+    try:
+        raw = _read_meminfo()
+    except (OSError, AttributeError):  # no /proc, or no os.pread (Windows)
+        return status
+    total = _MEMINFO_TOTAL_RE.search(raw)
+    available = _MEMINFO_AVAILABLE_RE.search(raw)
+    if total and available:
+        mem_total = int(total.group(1)) * 1024  # kB -> bytes
+        mem_available = int(available.group(1)) * 1024
+        status["memory"] = {
+            "total": mem_total,
+            "available": mem_available,
+            "percent": round((1 - mem_available / mem_total) * 100, 1),
+        }
     return status
 
 
+@app.get("/api/system/status")
+def system_status() -> Dict[str, Any]:
+    """Return system resource usage."""
+    now = time.monotonic()
+    if now >= _system_status_cache["expires"]:
+        _system_status_cache["value"] = _read_system_status()
+        _system_status_cache["expires"] = now + _SYSTEM_STATUS_TTL
+    return _system_status_cache["value"]
+
+
 @app.get("/api/stats")
-def get_stats() -> Dict[str, Any]:
+def get_stats(response: Response) -> Dict[str, Any]:
     """Return aggregated run statistics."""
+    response.headers["Cache-Control"] = f"private, max-age={int(_STATS_TTL)}"
     return RUN_STORE.get_stats()
 
 
@@ -887,45 +1723,41 @@ def delete_run(run_id: str) -> Dict[str, bool]:
 @app.delete("/api/runs")
 def delete_runs(run_ids: List[str] = Body(...)) -> Dict[str, int]:
     """Bulk delete run records."""
-    count = 0
-    for run_id in run_ids:
-        try:
-            with RUNS_LOCK:
-                if run_id in RUNS:
-                    if RUNS[run_id].status in ("queued", "running"):
-                        continue
-                    del RUNS[run_id]
-            if RUN_STORE.delete(run_id):
-                count += 1
-        except Exception:
-            pass
-    return {"deleted": count}
+    deletable: List[str] = []
+    with RUNS_LOCK:
+        for run_id in dict.fromkeys(run_ids):
+            record = RUNS.get(run_id)
+            if record is not None:
+                if record.status in ("queued", "running"):
+                    continue
+                del RUNS[run_id]
+            deletable.append(run_id)
+    return {"deleted": RUN_STORE.delete_many(deletable) if deletable else 0}
 
 
 def _execute_run(run_id: str, payload: RunRequest, cancel_event: threading.Event) -> None:
     """Worker that executes the script via ScriptRunner and updates the run registry."""
 
     started_at = datetime.utcnow()
+    running = RunRecord(
+        id=run_id,
+        status="running",
+        started_at=started_at,
+        finished_at=None,
+        request=payload,
+    )
     with RUNS_LOCK:
-        RUNS[run_id] = RunRecord(
-            id=run_id,
-            status="running",
-            started_at=started_at,
-            finished_at=None,
-            request=payload,
-        )
-    RUN_STORE.upsert(RUNS[run_id])
+        RUNS[run_id] = running
+    # The queued row already holds the request; only the transition changes.
+    if not RUN_STORE.update_fields(run_id, status="running", started_at=started_at):
+        RUN_STORE.upsert(running)
 
     try:
         if cancel_event.is_set():
             raise RuntimeError("Run cancelled before start")
 
-        # Filter dangerous env vars before passing to ScriptRunner
-        safe_env_vars = {
-            k: v for k, v in payload.env_vars.items()
-            if k not in _DANGEROUS_ENV_VARS
-        }
-
+        # Re-check at execution time: the script may have been replaced by a
+        # symlink, moved or deleted while the run sat in the queue.
         runner = ScriptRunner(
             str(_validate_script_path(payload.script_path)),
             script_args=payload.args,
@@ -934,7 +1766,8 @@ def _execute_run(run_id: str, payload: RunRequest, cancel_event: threading.Event
             history_db=payload.history_db,
             enable_history=payload.enable_history,
             working_dir=payload.working_dir,
-            env_vars=safe_env_vars,
+            # Already stripped of _DANGEROUS_ENV_VARS by _validate_payload.
+            env_vars=payload.env_vars,
             stream_output=payload.stream_output,
         )
 
@@ -1030,9 +1863,9 @@ def _execute_run(run_id: str, payload: RunRequest, cancel_event: threading.Event
             except Exception:
                 pass
 
-        with RUNS_LOCK:
-            if run_id in RUN_HANDLES:
-                RUN_HANDLES[run_id]["runner"] = runner
+        handle = RUN_HANDLES.get(run_id)
+        if handle is not None:
+            handle["runner"] = runner
 
         # --- Dry run ---
         if payload.dry_run:
@@ -1132,10 +1965,15 @@ def _execute_run(run_id: str, payload: RunRequest, cancel_event: threading.Event
             correlation_id=correlation_id,
             run_status=run_status,
             error_summary=error_summary,
+            stdout_path=_spill_log(run_id, "stdout", result.get("stdout")),
+            stderr_path=_spill_log(run_id, "stderr", result.get("stderr")),
         )
+        RUN_STORE.upsert(record)
+        logged = _logged_streams(record)
+        if logged:
+            record.result = _strip_logs(result, logged)
         with RUNS_LOCK:
             RUNS[run_id] = record
-        RUN_STORE.upsert(record)
 
     except Exception as exc:  # pragma: no cover - best effort logging
         finished_at = datetime.utcnow()
@@ -1152,26 +1990,29 @@ def _execute_run(run_id: str, payload: RunRequest, cancel_event: threading.Event
             RUNS[run_id] = record
         RUN_STORE.upsert(record)
     finally:
-        with RUNS_LOCK:
-            RUN_HANDLES.pop(run_id, None)
+        RUN_HANDLES.pop(run_id, None)
 
 
 def _validate_script_path(path_str: str) -> Path:
     if '\x00' in path_str:
         raise HTTPException(status_code=400, detail="Invalid script path")
-    raw_path = Path(path_str).expanduser()
-    if raw_path.is_symlink():
+    raw_path = os.path.expanduser(path_str)
+    if os.path.islink(raw_path):
         raise HTTPException(status_code=400, detail="Symlinks are not allowed")
-    candidate = raw_path.resolve()
-    if not candidate.is_file():
+    # One realpath() resolves every component; the rest are string checks.
+    candidate = os.path.realpath(raw_path)
+    if not os.path.isfile(candidate):
         raise HTTPException(status_code=400, detail="Script path must point to an existing file")
+    root = str(ALLOWED_SCRIPT_ROOT)
     try:
-        candidate.relative_to(ALLOWED_SCRIPT_ROOT)
-    except ValueError as exc:
-        raise HTTPException(status_code=400, detail="Script must reside within the allowed root") from exc
-    if candidate.suffix not in {".py", ".pyw"}:
+        inside = os.path.commonpath([root, candidate]) == root
+    except ValueError:  # different drives on Windows
+        inside = False
+    if not inside:
+        raise HTTPException(status_code=400, detail="Script must reside within the allowed root")
+    if os.path.splitext(candidate)[1] not in {".py", ".pyw"}:
         raise HTTPException(status_code=400, detail="Only Python files are allowed")
-    return candidate
+    return Path(candidate)
 
 
 # Environment variables that must not be overridden by API callers.
@@ -1180,21 +2021,53 @@ _DANGEROUS_ENV_VARS = frozenset({
     "DYLD_LIBRARY_PATH", "DYLD_INSERT_LIBRARIES",
 })
 
+# Buffer size for streaming uploaded scripts to disk.
+_UPLOAD_COPY_BUFSIZE = 1024 * 1024
+
+
+def _copy_upload(src: BinaryIO, dst: BinaryIO) -> None:
+    """Copy an upload into ``dst``, inside the kernel when it was spooled to disk.
+
+    Small uploads stay in SpooledTemporaryFile's memory buffer, where asking
+    for a descriptor would force them onto disk, so they (and any platform
+    or filesystem without copy_file_range) take the userspace copy.
+    """
+    # Same test Starlette's UploadFile uses for "not in memory".
+    if getattr(src, "_rolled", True) and hasattr(os, "copy_file_range"):
+        copied = 0
+        try:
+            src_fd, dst_fd = src.fileno(), dst.fileno()
+            offset = src.tell()
+            while True:
+                n = os.copy_file_range(src_fd, dst_fd, 1 << 30, offset + copied)
+                if not n:
+                    return
+                copied += n
+        except OSError:
+            if copied:
+                raise
+    shutil.copyfileobj(src, dst, _UPLOAD_COPY_BUFSIZE)
+
+
 # Maximum size (in bytes) for captured stdout/stderr to prevent memory exhaustion.
 _MAX_OUTPUT_SIZE = 10 * 1024 * 1024  # 10 MB
 
 
 def _validate_payload(payload: RunRequest) -> RunRequest:
-    _validate_script_path(payload.script_path)
+    # Keep the canonical path so execution never has to resolve it again.
+    payload.script_path = str(_validate_script_path(payload.script_path))
     if payload.timeout is not None and payload.timeout <= 0:
         raise HTTPException(status_code=400, detail="Timeout must be a positive integer")
     if len(payload.args) > 50:
         raise HTTPException(status_code=400, detail="Too many arguments supplied")
-    # Filter out dangerous environment variables
-    payload.env_vars = {
-        k: v for k, v in payload.env_vars.items()
-        if k not in _DANGEROUS_ENV_VARS
-    }
+    # Filter out dangerous environment variables; the key-view intersection
+    # means the common clean payload is not copied at all.
+    dangerous = payload.env_vars.keys() & _DANGEROUS_ENV_VARS
+    if dangerous:
+        payload.env_vars = {
+            k: v for k, v in payload.env_vars.items()
+            if k not in dangerous
+        }
     # Validate working_dir if provided
     if payload.working_dir is not None:
         wd = Path(payload.working_dir)
@@ -1203,38 +2076,63 @@ def _validate_payload(payload: RunRequest) -> RunRequest:
     return payload
 
 
-def _queue_run(payload: RunRequest, background_tasks: BackgroundTasks) -> Dict[str, str]:
-    """Helper to queue a run execution."""
-    run_id = str(uuid.uuid4())
-    now = datetime.utcnow()
-    record = RunRecord(
-        id=run_id,
-        status="queued",
-        started_at=now,
-        finished_at=None,
-        request=payload,
-    )
-    cancel_event = threading.Event()
-    with RUNS_LOCK:
-        RUNS[run_id] = record
+# Scripts execute on their own pool, so long-running jobs never occupy the
+# threadpool that serves sync endpoints.
+_RUN_WORKERS = min(32, (os.cpu_count() or 1) * 2)
+_RUN_EXECUTOR = ThreadPoolExecutor(max_workers=_RUN_WORKERS, thread_name_prefix="run")
+# Runs allowed to wait for a worker before new submissions get a 503.
+_RUN_QUEUE_LIMIT = 256
+_RUN_SLOTS = threading.BoundedSemaphore(_RUN_WORKERS + _RUN_QUEUE_LIMIT)
+
+
+def _acquire_run_slot() -> None:
+    """Reserve room for one more run, or reject the request with a 503."""
+    if not _RUN_SLOTS.acquire(blocking=False):
+        raise HTTPException(status_code=503, detail="Too many runs queued; retry later")
+
+
+def _queue_run(payload: RunRequest, slot_acquired: bool = False) -> Dict[str, str]:
+    """Helper to queue a run execution.
+
+    Pass ``slot_acquired=True`` when the caller already holds a slot from
+    ``_acquire_run_slot()``; it is released here if queueing fails.
+    """
+    if not slot_acquired:
+        _acquire_run_slot()
+    try:
+        run_id = secrets.token_hex(16)
+        now = datetime.utcnow()
+        record = RunRecord(
+            id=run_id,
+            status="queued",
+            started_at=now,
+            finished_at=None,
+            request=payload,
+        )
+        cancel_event = threading.Event()
         RUN_HANDLES[run_id] = {"cancel_event": cancel_event, "runner": None}
-    RUN_STORE.upsert(record)
+        with RUNS_LOCK:
+            RUNS[run_id] = record
+        RUN_STORE.upsert(record)
 
-    background_tasks.add_task(_execute_run, run_id, payload, cancel_event)
+        future = _RUN_EXECUTOR.submit(_execute_run, run_id, payload, cancel_event)
+    except BaseException:
+        _RUN_SLOTS.release()
+        raise
+    future.add_done_callback(lambda _: _RUN_SLOTS.release())
     return {"run_id": run_id, "status": "queued"}
 
 
 @app.post("/api/run", status_code=202)
-def trigger_run(payload: RunRequest, background_tasks: BackgroundTasks) -> Dict[str, str]:
+def trigger_run(payload: RunRequest) -> Dict[str, str]:
     """Queue a new script execution and return its identifier."""
 
     payload = _validate_payload(payload)
-    return _queue_run(payload, background_tasks)
+    return _queue_run(payload)
 
 
 @app.post("/api/run/upload", status_code=202)
 def trigger_run_upload(
-    background_tasks: BackgroundTasks,
     file: UploadFile = File(...),
     args: str = Form(""),
     timeout: Optional[int] = Form(None),
@@ -1245,28 +2143,38 @@ def trigger_run_upload(
     stream_output: bool = Form(False),
 ) -> Dict[str, str]:
     """Upload a script and queue execution."""
+    # Deliberately a sync endpoint: FastAPI runs it in the worker threadpool,
+    # so the blocking copy below never stalls the event loop.
     if not file.filename.endswith(('.py', '.pyw')):
         raise HTTPException(status_code=400, detail="Only Python files are allowed")
 
     # Ensure upload directory exists
     UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
 
-    safe_filename = f"{uuid.uuid4().hex}_{file.filename}"
+    safe_filename = f"{secrets.token_hex(16)}_{file.filename}"
     file_path = UPLOAD_DIR / safe_filename
 
-    with open(file_path, "wb") as buffer:
-        shutil.copyfileobj(file.file, buffer)
+    # Copy in 1 MiB blocks into a temporary name and rename into place, so a
+    # failed or partial upload never leaves a runnable script behind.
+    part_path = file_path.with_name(file_path.name + ".part")
+    try:
+        with open(part_path, "wb") as buffer:
+            _copy_upload(file.file, buffer)
+        os.replace(part_path, file_path)
+    except BaseException:
+        _unlink_quietly(str(part_path))
+        raise
 
     # Parse args (comma separated string)
     arg_list = [a.strip() for a in args.split(',') if a.strip()]
 
     try:
-        env_vars_dict = json.loads(env_vars)
+        env_vars_dict = _json_loads(env_vars)
     except json.JSONDecodeError:
         env_vars_dict = {}
 
     payload = RunRequest(
-        script_path=str(file_path.resolve()),
+        script_path=str(file_path),  # UPLOAD_DIR is already absolute and resolved
         args=arg_list,
         timeout=timeout,
         log_level=log_level,
@@ -1277,42 +2185,58 @@ def trigger_run_upload(
     )
 
     payload = _validate_payload(payload)
-    return _queue_run(payload, background_tasks)
+    return _queue_run(payload)
 
 
-@app.get("/api/runs")
+@app.get("/api/runs", response_model=List[RunRecord])
 def list_runs(
     limit: int = Query(50, ge=1, le=200, description="Maximum number of runs to return"),
     offset: int = Query(0, ge=0, description="Offset for pagination"),
     status: Optional[str] = Query(None, description="Optional status filter"),
-) -> List[RunRecord]:
-    """Return a summary of recent runs (newest first)."""
+) -> ORJSONResponse:
+    """Return a summary of recent runs (newest first).
 
-    return RUN_STORE.list(limit=limit, offset=offset, status=status)
+    ``result`` is omitted from the listing; fetch ``/api/runs/{run_id}`` for it.
+    """
 
+    # Rows were written by this service, so skip RunRecord validation and
+    # jsonable_encoder and serialise the stored JSON straight back out.
+    return ORJSONResponse(RUN_STORE.list_dicts(limit=limit, offset=offset, status=status))
 
-@app.get("/api/runs/{run_id}")
-def get_run(run_id: str) -> RunRecord:
+
+@app.get("/api/runs/{run_id}", response_model=RunRecord)
+def get_run(run_id: str) -> ORJSONResponse:
     """Return details for a specific run."""
 
     with RUNS_LOCK:
         record = RUNS.get(run_id)
-    if not record:
-        record = RUN_STORE.get(run_id)
-    if not record:
+    if record:
+        return ORJSONResponse(record.dict())
+    data = RUN_STORE.get_dict(run_id)
+    if not data:
         raise HTTPException(status_code=404, detail="Run not found")
-    return record
+    return ORJSONResponse(data)
 
 
-@app.post("/api/runs/{run_id}/cancel")
-def cancel_run(run_id: str) -> Dict[str, str]:
+def _lookup_run(run_id: str) -> Tuple[RunRecord, Optional[Dict[str, Any]]]:
+    """Return a run and its live handle (if any), or raise 404.
+
+    Active runs are pinned in RUNS, so only finished or evicted runs cost
+    a RUN_STORE read.
+    """
+    handle = RUN_HANDLES.get(run_id)
     with RUNS_LOCK:
-        handle = RUN_HANDLES.get(run_id)
         record = RUNS.get(run_id)
     if not record:
         record = RUN_STORE.get(run_id)
     if not record:
         raise HTTPException(status_code=404, detail="Run not found")
+    return record, handle
+
+
+@app.post("/api/runs/{run_id}/cancel")
+def cancel_run(run_id: str) -> Dict[str, str]:
+    record, handle = _lookup_run(run_id)
     if record.status in {"completed", "failed", "cancelled"}:
         raise HTTPException(status_code=409, detail="Run already finished")
     if handle:
@@ -1332,6 +2256,8 @@ def cancel_run(run_id: str) -> Dict[str, str]:
         correlation_id=record.correlation_id,
         run_status=record.run_status,
         error_summary=record.error_summary,
+        stdout_path=record.stdout_path,
+        stderr_path=record.stderr_path,
     )
     with RUNS_LOCK:
         RUNS[run_id] = updated
@@ -1340,20 +2266,14 @@ def cancel_run(run_id: str) -> Dict[str, str]:
 
 
 @app.post("/api/runs/{run_id}/stop")
-def stop_run(run_id: str) -> Dict[str, str]:
+def stop_run(run_id: str) -> Dict[str, Any]:
     """Send a graceful stop signal to the running script process.
 
     Sets the runner's internal stop event (watchdog picks it up) and
     terminates the process tree.  Use this for a clean, user-triggered
     interruption.  If the run is already finished, returns 409.
     """
-    with RUNS_LOCK:
-        record = RUNS.get(run_id)
-        handle = RUN_HANDLES.get(run_id)
-    if not record:
-        record = RUN_STORE.get(run_id)
-    if not record:
-        raise HTTPException(status_code=404, detail="Run not found")
+    record, handle = _lookup_run(run_id)
     if record.status not in {"queued", "running"}:
         raise HTTPException(status_code=409, detail="Run is not active")
 
@@ -1369,19 +2289,13 @@ def stop_run(run_id: str) -> Dict[str, str]:
 
 
 @app.post("/api/runs/{run_id}/kill")
-def kill_run(run_id: str) -> Dict[str, str]:
+def kill_run(run_id: str) -> Dict[str, Any]:
     """Forcefully kill the running script and all child processes.
 
     Unlike ``/stop``, this does not set the stop event first; it
     immediately delivers SIGKILL to the entire process group.
     """
-    with RUNS_LOCK:
-        record = RUNS.get(run_id)
-        handle = RUN_HANDLES.get(run_id)
-    if not record:
-        record = RUN_STORE.get(run_id)
-    if not record:
-        raise HTTPException(status_code=404, detail="Run not found")
+    record, handle = _lookup_run(run_id)
     if record.status not in {"queued", "running"}:
         raise HTTPException(status_code=409, detail="Run is not active")
 
@@ -1396,24 +2310,9 @@ def kill_run(run_id: str) -> Dict[str, str]:
     return {"run_id": run_id, "killed": killed}
 
 
-@app.post("/api/runs/{run_id}/restart", status_code=202)
-def restart_run(run_id: str, background_tasks: BackgroundTasks) -> Dict[str, str]:
-    """Stop the current run (if active) and queue a fresh execution with the same parameters.
-
-    The original run record is marked as ``cancelled`` (if still active) and
-    a brand-new run record is created with the same ``RunRequest``.
-    """
-    with RUNS_LOCK:
-        record = RUNS.get(run_id)
-    if not record:
-        record = RUN_STORE.get(run_id)
-    if not record:
-        raise HTTPException(status_code=404, detail="Run not found")
-
-    # Stop the existing run if still active
+def _cancel_for_restart(run_id: str, record: RunRecord, handle: Optional[Dict[str, Any]]) -> None:
+    """Stop the run being restarted (if still active) and record it as cancelled."""
     if record.status in {"queued", "running"}:
-        with RUNS_LOCK:
-            handle = RUN_HANDLES.get(run_id)
         if handle:
             handle["cancel_event"].set()
             runner: Optional[ScriptRunner] = handle.get("runner")
@@ -1431,17 +2330,37 @@ def restart_run(run_id: str, background_tasks: BackgroundTasks) -> Dict[str, str
             correlation_id=record.correlation_id,
             run_status=record.run_status,
             error_summary=record.error_summary,
+            stdout_path=record.stdout_path,
+            stderr_path=record.stderr_path,
         )
         with RUNS_LOCK:
             RUNS[run_id] = cancelled
         RUN_STORE.upsert(cancelled)
 
-    # Queue a new run with the same payload
-    return _queue_run(record.request, background_tasks)
+
+@app.post("/api/runs/{run_id}/restart", status_code=202)
+def restart_run(run_id: str) -> Dict[str, str]:
+    """Stop the current run (if active) and queue a fresh execution with the same parameters.
+
+    The original run record is marked as ``cancelled`` (if still active) and
+    a brand-new run record is created with the same ``RunRequest``.
+    """
+    record, handle = _lookup_run(run_id)
+    # Validate a fresh copy (the script may have changed since the original
+    # run was accepted) and reserve a slot before touching the active run, so
+    # a rejected restart leaves it running.
+    payload = _validate_payload(RunRequest.construct(**record.request.dict()))
+    _acquire_run_slot()
+    try:
+        _cancel_for_restart(run_id, record, handle)
+    except BaseException:
+        _RUN_SLOTS.release()
+        raise
+    return _queue_run(payload, slot_acquired=True)
 
 
 @app.get("/api/runs/{run_id}/events")
-def get_run_events(run_id: str) -> List[Dict[str, Any]]:
+def get_run_events(run_id: str) -> ORJSONResponse:
     """Return the structured execution events recorded by StructuredLogger for a run.
 
     Events are stored on the ``ScriptRunner.structured_logger`` while the job
@@ -1450,12 +2369,11 @@ def get_run_events(run_id: str) -> List[Dict[str, Any]]:
     if the run is not found or has no events.
     """
     # Check in-memory handle first (for live/active runs)
-    with RUNS_LOCK:
-        handle = RUN_HANDLES.get(run_id)
+    handle = RUN_HANDLES.get(run_id)
     if handle:
         runner: Optional[ScriptRunner] = handle.get("runner")
         if runner:
-            return runner.structured_logger.get_logs()
+            return ORJSONResponse(runner.structured_logger.get_logs())
 
     # For completed runs, events may be embedded in the stored result
     with RUNS_LOCK:
@@ -1466,23 +2384,64 @@ def get_run_events(run_id: str) -> List[Dict[str, Any]]:
         raise HTTPException(status_code=404, detail="Run not found")
 
     if record.result and isinstance(record.result.get("metrics"), dict):
-        return record.result["metrics"].get("events", [])
+        return ORJSONResponse(record.result["metrics"].get("events", []))
 
-    return []
+    return ORJSONResponse([])
+
+
+# Divider between the stdout and stderr sections of a run's log download.
+_STDERR_SEPARATOR = b"\n--- STDERR ---\n"
 
 
 @app.get("/api/runs/{run_id}/logs")
-def get_run_logs(run_id: str) -> StreamingResponse:
+def get_run_logs(run_id: str, request: Request) -> Response:
+    # The sync generator below is iterated via Starlette's threadpool, one
+    # 64KB chunk at a time, so large logs neither block the loop nor load
+    # fully into memory.
     logs = RUN_STORE.get_logs(run_id)
     if logs is None:
         raise HTTPException(status_code=404, detail="Run not found")
 
-    def stream() -> Any:
-        yield logs.get("stdout") or ""
-        if logs.get("stderr"):
-            yield "\n--- STDERR ---\n" + logs.get("stderr")
+    # Open up front so a missing file falls back to the stored tail without
+    # a separate existence check.
+    files = {name: _open_log_file(logs.get(f"{name}_path")) for name in ("stdout", "stderr")}
+
+    def _stream_part(name: str) -> Iterator[bytes]:
+        if files[name] is not None:
+            yield from _iter_log_file(files[name])
+        elif logs.get(name):
+            yield logs[name].encode("utf-8")
+
+    # Every chunk is bytes, so the separator and the stderr body go out as
+    # separate chunks and nothing is re-encoded or concatenated per chunk.
+    def stream() -> Iterator[bytes]:
+        yield from _stream_part("stdout")
+        if files["stderr"] is not None or logs.get("stderr"):
+            yield _STDERR_SEPARATOR
+            yield from _stream_part("stderr")
+
+    gzip_ok = _accepts_gzip(request)
+    # Output short enough to live only in the row (the common case) is
+    # already in memory: send it as one body instead of iterating a
+    # generator through the threadpool chunk by chunk.
+    if files["stdout"] is None and files["stderr"] is None:
+        body = b"".join(stream())
+        if gzip_ok:
+            return Response(
+                gzip.compress(body, compresslevel=6),
+                media_type="text/plain",
+                headers={"Content-Encoding": "gzip", "Vary": "Accept-Encoding"},
+            )
+        return Response(body, media_type="text/plain", headers={"Vary": "Accept-Encoding"})
 
-    return StreamingResponse(stream(), media_type="text/plain")
+    # Log text compresses well; gzip it chunk by chunk when the client allows.
+    if gzip_ok:
+        return StreamingResponse(
+            _gzip_stream(stream()),
+            media_type="text/plain",
+            headers={"Content-Encoding": "gzip", "Vary": "Accept-Encoding"},
+        )
+    return StreamingResponse(stream(), media_type="text/plain", headers={"Vary": "Accept-Encoding"})
 
 
 @app.get("/api/runs/{run_id}/visualization")
@@ -1494,8 +2453,7 @@ def get_run_visualization(run_id: str) -> Dict[str, Any]:
     the run did not have visualization enabled.
     """
     # Try in-memory first (active run)
-    with RUNS_LOCK:
-        handle = RUN_HANDLES.get(run_id)
+    handle = RUN_HANDLES.get(run_id)
     if handle:
         runner: Optional[ScriptRunner] = handle.get("runner")
         if runner and runner.visualizer.enabled:
@@ -1889,7 +2847,7 @@ def delete_scheduled_task(task_id: str) -> Dict[str, bool]:
 
 
 @app.post("/api/scheduler/tasks/{task_id}/run", status_code=202)
-def run_scheduled_task_now(task_id: str, background_tasks: BackgroundTasks) -> Dict[str, str]:
+def run_scheduled_task_now(task_id: str) -> Dict[str, str]:
     """Trigger a scheduled task immediately."""
     scheduler = _get_scheduler()
     if task_id not in scheduler.tasks:
@@ -1900,7 +2858,7 @@ def run_scheduled_task_now(task_id: str, background_tasks: BackgroundTasks) -> D
         payload = _validate_payload(payload)
     except HTTPException:
         raise
-    return _queue_run(payload, background_tasks)
+    return _queue_run(payload)
 
 
 @app.post("/api/scheduler/events/{event_name}")
@@ -2035,9 +2993,11 @@ def list_library_scripts(
     tag: Optional[str] = Query(None),
     page: int = Query(1, ge=1),
     page_size: int = Query(50, ge=1, le=200),
-) -> Dict[str, Any]:
+) -> ORJSONResponse:
     """List indexed scripts with optional filters."""
-    return SCRIPT_LIBRARY.list_scripts(
+    # Plain dicts straight from SQLite: skip return-annotation validation and
+    # jsonable_encoder, as list_runs does.
+    return ORJSONResponse(SCRIPT_LIBRARY.list_scripts(
         root_id=root_id,
         language=language,
         status=status,
@@ -2045,7 +3005,7 @@ def list_library_scripts(
         tag=tag,
         page=page,
         page_size=page_size,
-    )
+    ))
 
 
 @app.get("/api/library/scripts/{script_id}")
@@ -2136,9 +3096,9 @@ def delete_library_tag(tag_id: int) -> Dict[str, bool]:
 # ---- Duplicates ----
 
 @app.get("/api/library/duplicates")
-def list_library_duplicates() -> List[Dict[str, Any]]:
+def list_library_duplicates() -> ORJSONResponse:
     """Return groups of scripts that appear to be duplicates (same name + size + line count)."""
-    return SCRIPT_LIBRARY.list_duplicates()
+    return ORJSONResponse(SCRIPT_LIBRARY.list_duplicates())
 
 
 # ---- Run from Library ----
@@ -2146,7 +3106,6 @@ def list_library_duplicates() -> List[Dict[str, Any]]:
 @app.post("/api/library/scripts/{script_id}/run", status_code=202)
 def run_library_script(
     script_id: int,
-    background_tasks: BackgroundTasks,
     args: List[str] = Body(default_factory=list),
     timeout: Optional[int] = Body(None),
     env_vars: Dict[str, str] = Body(default_factory=dict),
@@ -2172,25 +3131,61 @@ def run_library_script(
         payload = _validate_payload(payload)
     except HTTPException:
         raise
-    return _queue_run(payload, background_tasks)
+    return _queue_run(payload)
+
+
+_DASHBOARD_CACHE: Dict[str, Any] = {}
 
 
 def _load_dashboard_html() -> str:
     dashboard_path = Path(__file__).with_name("static") / "index.html"
-    if not dashboard_path.exists():
-        raise FileNotFoundError("Dashboard asset missing")
-    return dashboard_path.read_text(encoding="utf-8")
+    try:
+        return dashboard_path.read_text(encoding="utf-8")
+    except FileNotFoundError as exc:
+        raise FileNotFoundError("Dashboard asset missing") from exc
+
+
+def _dashboard_asset() -> Dict[str, Any]:
+    """Return the dashboard HTML, its ETag and a gzipped copy, reading the file only once."""
+    if not _DASHBOARD_CACHE:
+        raw = _load_dashboard_html().encode("utf-8")
+        # Weak, since the identity and gzip bodies share one validator.
+        _DASHBOARD_CACHE["etag"] = 'W/"%s"' % hashlib.sha256(raw).hexdigest()[:32]
+        _DASHBOARD_CACHE["gzip"] = gzip.compress(raw, compresslevel=9, mtime=0)
+        # Kept encoded so plain responses skip a per-request str.encode().
+        _DASHBOARD_CACHE["html"] = raw
+    return _DASHBOARD_CACHE
 
 
 @app.get("/", response_class=HTMLResponse)
-def dashboard_page() -> HTMLResponse:
+def dashboard_page(request: Request) -> Response:
     """Serve the lightweight dashboard that drives the API."""
 
-    html = _load_dashboard_html()
-    return HTMLResponse(content=html)
+    asset = _dashboard_asset()
+    headers = {"ETag": asset["etag"], "Cache-Control": "public, max-age=60", "Vary": "Accept-Encoding"}
+    if request.headers.get("if-none-match") == asset["etag"]:
+        return Response(status_code=304, headers=headers)
+    # Compressed once up front, so gzip-capable clients cost no CPU per hit.
+    if _accepts_gzip(request):
+        headers["Content-Encoding"] = "gzip"
+        return HTMLResponse(content=asset["gzip"], headers=headers)
+    return HTMLResponse(content=asset["html"], headers=headers)
+
+
+class _CachedStaticFiles(StaticFiles):
+    """StaticFiles whose responses browsers may reuse briefly without revalidating.
+
+    Asset URLs carry no content hash, so this matches the dashboard's own
+    short max-age rather than marking them immutable.
+    """
+
+    def file_response(self, *args: Any, **kwargs: Any) -> Response:
+        response = super().file_response(*args, **kwargs)
+        response.headers.setdefault("Cache-Control", "public, max-age=60")
+        return response
 
 
-app.mount("/static", StaticFiles(directory=Path(__file__).with_name("static")), name="static")
+app.mount("/static", _CachedStaticFiles(directory=Path(__file__).with_name("static")), name="static")
 
 
 if __name__ == "__main__":
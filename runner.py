@@ -7018,6 +7018,9 @@ class ScriptRunner:
 
         # WEBAPI integration: track active process for cancellation requests
         self._active_process = None
+        # Set by cancel_active_run() when a stop() kills the registered
+        # process, so that execution alone is reported as 'killed'.
+        self._active_kill_event: Optional[threading.Event] = None
         self._active_process_lock = threading.Lock()
         
         # OpenTelemetry Tracing (v7)
@@ -7363,6 +7366,7 @@ class ScriptRunner:
 
         with self._active_process_lock:
             process = self._active_process
+            kill_event = self._active_kill_event
         if not process:
             return False
 
@@ -7373,6 +7377,8 @@ class ScriptRunner:
                 except Exception:
                     continue
             process.kill()
+            if kill_event is not None and self._stop_event.is_set():
+                kill_event.set()
             # Poll briefly instead of waiting with psutil.wait() to avoid
             # stealing the exit status from subprocess.communicate().
             for _ in range(50):  # up to 2.5 s
@@ -7385,6 +7391,7 @@ class ScriptRunner:
         finally:
             with self._active_process_lock:
                 self._active_process = None
+                self._active_kill_event = None
 
     # ------------------------------------------------------------------
     # Lifecycle controls: start / stop / kill / restart
@@ -7393,8 +7400,8 @@ class ScriptRunner:
     def stop(self) -> bool:
         """Signal the running script to stop.
 
-        Sets the internal stop event (checked by the watchdog thread) and
-        then forcefully terminates the active process tree.  Call this to
+        Sets the internal stop event (used to report the run as
+        ``killed``) and then forcefully terminates the active process tree.  Call this to
         perform a controlled, user-triggered stop while a script is running.
 
         Returns:
@@ -7529,6 +7536,7 @@ class ScriptRunner:
                 self.visualizer.show_subprocess_start(cmd, proc.pid)
                 with self._active_process_lock:
                     self._active_process = child_process
+                    self._active_kill_event = _forced_kill
                 self.visualizer.show_step("Monitoring", "Attaching process monitor to subprocess", "running")
                 monitor.start(child_process)
                 self.visualizer.show_step("Monitoring", "Process monitoring active", "done")
@@ -7536,31 +7544,21 @@ class ScriptRunner:
                 self.logger.warning("Could not attach monitor to child process")
                 self.visualizer.show_step("Monitoring", "Could not attach monitor (process terminated quickly)", "skip")
 
-            # Watchdog thread: honours user-triggered stop (_stop_event) and
-            # kills the child process if it is set while the process is running.
-            def _watchdog():
-                while proc.poll() is None:
-                    if self._stop_event.is_set():
-                        _forced_kill.set()
-                        if child_process:
-                            for _ch in child_process.children(recursive=True):
-                                try:
-                                    _ch.kill()
-                                except Exception:
-                                    pass
-                            try:
-                                child_process.kill()
-                            except Exception:
-                                pass
+            # stop() kills the registered active process directly, so no
+            # watchdog polling is needed; only a stop requested before the
+            # child was registered has to be honoured here.
+            if self._stop_event.is_set() and proc.poll() is None:
+                _forced_kill.set()
+                if child_process:
+                    for _ch in child_process.children(recursive=True):
                         try:
-                            proc.kill()
+                            _ch.kill()
                         except Exception:
                             pass
-                        return
-                    time.sleep(0.05)
-
-            watchdog_thread = threading.Thread(target=_watchdog, daemon=True)
-            watchdog_thread.start()
+                try:
+                    proc.kill()
+                except Exception:
+                    pass
 
             # Show monitoring updates periodically
             if self.visualizer.enabled:
@@ -7589,25 +7587,25 @@ class ScriptRunner:
                 t_out.start()
                 t_err.start()
 
-                # Wait for the process, honouring the timeout and stop_event
-                deadline = time.time() + self.timeout if self.timeout else None
-                while proc.poll() is None:
-                    if deadline and time.time() >= deadline:
-                        if child_process:
-                            for _ch in child_process.children(recursive=True):
-                                try:
-                                    _ch.kill()
-                                except Exception:
-                                    pass
+                # Block on the process instead of polling; stop() kills it,
+                # which makes proc.wait() return.
+                try:
+                    proc.wait(timeout=self.timeout)
+                except subprocess.TimeoutExpired:
+                    if child_process:
+                        for _ch in child_process.children(recursive=True):
                             try:
-                                child_process.kill()
+                                _ch.kill()
                             except Exception:
                                 pass
-                        proc.kill()
-                        t_out.join(timeout=2)
-                        t_err.join(timeout=2)
-                        raise subprocess.TimeoutExpired(cmd, self.timeout)
-                    time.sleep(0.05)
+                        try:
+                            child_process.kill()
+                        except Exception:
+                            pass
+                    proc.kill()
+                    t_out.join(timeout=2)
+                    t_err.join(timeout=2)
+                    raise
 
                 t_out.join(timeout=5)
                 t_err.join(timeout=5)
@@ -7637,7 +7635,7 @@ class ScriptRunner:
             end_timestamp = datetime.now().isoformat()
             execution_time = end_time - start_time
 
-            # Determine status: 'killed' if user-triggered stop fired
+            # Determine status: 'killed' if a user-triggered stop killed this process
             if _forced_kill.is_set():
                 run_status = 'killed'
                 # psutil.wait() can steal the exit status and leave returncode 0;
@@ -7816,6 +7814,7 @@ class ScriptRunner:
         finally:
             with self._active_process_lock:
                 self._active_process = None
+                self._active_kill_event = None
 
             # Check alerts
             if self.alert_manager.alerts:
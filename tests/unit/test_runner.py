@@ -1125,6 +1125,42 @@ class TestLifecycleControls:
         # The script was forcibly stopped; return code should be non-zero
         assert results[0]['returncode'] != 0
 
+    def test_stop_during_streamed_execution_reports_killed(self, tmp_path):
+        """stop() must interrupt the blocking wait used by stream_output."""
+        script_file = tmp_path / "hang.py"
+        script_file.write_text("import time\ntime.sleep(30)")
+        runner = ScriptRunner(str(script_file), enable_history=False, stream_output=True)
+
+        results: List[Any] = []
+        t = threading.Thread(target=lambda: results.append(runner.run_script()))
+        t.start()
+        time.sleep(0.5)
+        runner.stop()
+        t.join(timeout=8)
+
+        assert len(results) == 1
+        assert results[0]['status'] == 'killed'
+        assert results[0]['returncode'] != 0
+
+    def test_stop_after_process_exit_keeps_success(self, tmp_path):
+        """A stop() landing during monitor teardown must not relabel a finished run."""
+        script_file = tmp_path / "ok.py"
+        script_file.write_text("exit(0)")
+        runner = ScriptRunner(str(script_file), enable_history=False)
+
+        import runner as runner_module
+        original_stop = runner_module.ProcessMonitor.stop
+
+        def _stop_then_request(monitor):
+            original_stop(monitor)
+            runner.stop()
+
+        with patch.object(runner_module.ProcessMonitor, "stop", _stop_then_request):
+            result = runner.run_script()
+
+        assert result['status'] == 'success'
+        assert result['returncode'] == 0
+
 
 class TestStreamOutput:
     """Test real-time output streaming"""
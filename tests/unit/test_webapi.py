@@ -9,13 +9,19 @@ Covers:
 """
 from __future__ import annotations
 
+import gc
+import gzip
+import io
 import json
 import os
+import sqlite3
 import sys
 import threading
 import time
-from datetime import datetime
+import weakref
+from datetime import datetime, timedelta
 from pathlib import Path
+from types import SimpleNamespace
 from unittest.mock import MagicMock
 
 import pytest
@@ -52,6 +58,7 @@ def _fresh_db(tmp_path: Path) -> None:
     db_path = tmp_path / "runs.db"
     _api_module.RUN_STORE = _api_module.RunStore(db_path)
     _api_module.SCRIPT_LIBRARY = _api_module.ScriptLibrary(db_path)
+    _api_module.LOG_DIR = tmp_path / "logs"
     with _api_module.RUNS_LOCK:
         _api_module.RUNS.clear()
     _api_module.RUN_HANDLES.clear()
@@ -62,10 +69,18 @@ def _fresh_db(tmp_path: Path) -> None:
 # ---------------------------------------------------------------------------
 
 
+def _drain_runs(timeout: float = 10.0) -> None:
+    """Wait for runs still executing on the run pool so they cannot outlive the test."""
+    deadline = time.monotonic() + timeout
+    while _api_module.RUN_HANDLES and time.monotonic() < deadline:
+        time.sleep(0.05)
+
+
 @pytest.fixture()
 def client(tmp_path):
     _fresh_db(tmp_path)
-    return TestClient(_api_module.app)
+    yield TestClient(_api_module.app)
+    _drain_runs()
 
 
 @pytest.fixture()
@@ -76,6 +91,7 @@ def sample_script():
     script = examples / "_webapi_test_sample.py"
     script.write_text("print('hello')\n")
     yield script
+    _drain_runs()  # queued runs may not have executed it yet
     script.unlink(missing_ok=True)
 
 
@@ -86,6 +102,7 @@ def failing_script():
     script = examples / "_webapi_fail_sample.py"
     script.write_text("import sys; sys.exit(42)\n")
     yield script
+    _drain_runs()  # queued runs may not have executed it yet
     script.unlink(missing_ok=True)
 
 
@@ -173,6 +190,35 @@ class TestRunRecordModel:
         assert rec.error_summary is None
 
 
+class TestRunsCache:
+    def test_evicts_least_recently_used(self):
+        cache = _api_module._LRUCache(maxsize=2)
+        cache["a"] = 1
+        cache["b"] = 2
+        assert cache.get("a") == 1  # refreshes "a"
+        cache["c"] = 3
+        assert "b" not in cache
+        assert list(cache) == ["a", "c"]
+
+    def test_active_runs_are_pinned(self):
+        cache = _api_module._RunCache(maxsize=2)
+        cache["live"] = SimpleNamespace(status="running")
+        cache["done"] = SimpleNamespace(status="completed")
+        cache["new"] = SimpleNamespace(status="queued")
+        assert list(cache) == ["live", "new"]
+        cache["newer"] = SimpleNamespace(status="running")
+        assert list(cache) == ["live", "new", "newer"]
+
+    def test_evicted_run_still_served_from_store(self, client, sample_script):
+        payload = {"script_path": str(sample_script), "enable_history": False}
+        run_id = client.post("/api/run", json=payload).json()["run_id"]
+        with _api_module.RUNS_LOCK:
+            _api_module.RUNS.pop(run_id, None)
+        r = client.get(f"/api/runs/{run_id}")
+        assert r.status_code == 200
+        assert r.json()["id"] == run_id
+
+
 # ---------------------------------------------------------------------------
 # Input validation
 # ---------------------------------------------------------------------------
@@ -184,6 +230,22 @@ class TestInputValidation:
         r = client.post("/api/run", json=payload)
         assert r.status_code == 400
 
+    def test_script_path_containment(self, tmp_path, monkeypatch):
+        root = tmp_path / "root"
+        sibling = tmp_path / "root-evil"
+        root.mkdir()
+        sibling.mkdir()
+        (root / "ok.py").write_text("")
+        (sibling / "bad.py").write_text("")
+        os.symlink(root / "ok.py", root / "link.py")
+        monkeypatch.setattr(_api_module, "ALLOWED_SCRIPT_ROOT", root.resolve())
+        validate = _api_module._validate_script_path
+
+        assert validate(str(root / "ok.py")) == (root / "ok.py").resolve()
+        for bad in (sibling / "bad.py", root / ".." / "root-evil" / "bad.py", root / "link.py"):
+            with pytest.raises(_api_module.HTTPException):
+                validate(str(bad))
+
     def test_dangerous_env_var_filtered_and_queued(self, client, sample_script):
         """PATH must be stripped; the run itself should still be queued."""
         payload = {
@@ -194,6 +256,8 @@ class TestInputValidation:
         r = client.post("/api/run", json=payload)
         assert r.status_code == 202
         assert "run_id" in r.json()
+        stored = client.get(f"/api/runs/{r.json()['run_id']}").json()
+        assert stored["request"]["env_vars"] == {"SAFE_VAR": "ok"}
 
     def test_negative_timeout_rejected(self, client, sample_script):
         payload = {"script_path": str(sample_script), "timeout": -1}
@@ -260,6 +324,27 @@ class TestRunLifecycle:
         assert r.status_code == 200
         assert isinstance(r.json(), list)
 
+    def test_list_runs_items_match_record_shape(self, client, sample_script):
+        payload = {"script_path": str(sample_script), "enable_history": False}
+        run_id = client.post("/api/run", json=payload).json()["run_id"]
+        items = client.get("/api/runs").json()
+        item = next(i for i in items if i["id"] == run_id)
+        assert item["request"]["script_path"] == str(sample_script.resolve())
+        assert datetime.fromisoformat(item["started_at"])
+        public = {name for name, field in _api_module.RunRecord.__fields__.items() if not field.exclude}
+        assert public <= set(item)
+
+    def test_list_runs_omits_result_payload(self, client, sample_script):
+        req = _api_module.RunRequest(script_path=str(sample_script), enable_history=False)
+        _api_module.RUN_STORE.upsert(_api_module.RunRecord(
+            id="summary-id", status="completed", started_at=datetime.utcnow(),
+            finished_at=datetime.utcnow(), request=req, result={"returncode": 0, "stdout": "out"},
+        ))
+        item = next(i for i in client.get("/api/runs").json() if i["id"] == "summary-id")
+        assert item["result"] is None
+        assert item["status"] == "completed"
+        assert client.get("/api/runs/summary-id").json()["result"]["stdout"] == "out"
+
     def test_cancel_nonexistent_run(self, client):
         r = client.post("/api/runs/does-not-exist/cancel")
         assert r.status_code == 404
@@ -271,6 +356,41 @@ class TestRunLifecycle:
         assert r.status_code == 200
 
 
+class TestUploadEndpoint:
+    def test_upload_writes_script_atomically(self, client, tmp_path, monkeypatch):
+        upload_dir = tmp_path / "uploads"
+        monkeypatch.setattr(_api_module, "UPLOAD_DIR", upload_dir)
+        monkeypatch.setattr(_api_module, "ALLOWED_SCRIPT_ROOT", tmp_path.resolve())
+        r = client.post(
+            "/api/run/upload",
+            files={"file": ("job.py", b"print('uploaded')\n", "text/x-python")},
+        )
+        assert r.status_code == 202
+        files = list(upload_dir.iterdir())
+        assert len(files) == 1
+        assert files[0].name.endswith("_job.py")
+        assert files[0].read_bytes() == b"print('uploaded')\n"
+
+    def test_upload_spooled_to_disk_copied_intact(self, client, tmp_path, monkeypatch):
+        upload_dir = tmp_path / "uploads"
+        monkeypatch.setattr(_api_module, "UPLOAD_DIR", upload_dir)
+        monkeypatch.setattr(_api_module, "ALLOWED_SCRIPT_ROOT", tmp_path.resolve())
+        body = b"".join(b"# line %d\n" % i for i in range(300_000))  # past the 1 MiB spool limit
+        r = client.post("/api/run/upload", files={"file": ("big.py", body, "text/x-python")})
+        assert r.status_code == 202
+        assert next(upload_dir.iterdir()).read_bytes() == body
+
+    def test_copy_upload_falls_back_without_descriptor(self, tmp_path):
+        dst = tmp_path / "out.py"
+        with open(dst, "wb") as out:
+            _api_module._copy_upload(io.BytesIO(b"print(1)\n"), out)
+        assert dst.read_bytes() == b"print(1)\n"
+
+    def test_upload_rejects_non_python(self, client):
+        r = client.post("/api/run/upload", files={"file": ("job.sh", b"echo hi", "text/plain")})
+        assert r.status_code == 400
+
+
 # ---------------------------------------------------------------------------
 # New lifecycle endpoints: stop, kill, restart
 # ---------------------------------------------------------------------------
@@ -305,6 +425,13 @@ class TestNewLifecycleEndpoints:
         if r.status_code == 200:
             assert r.json()["run_id"] == run_id
 
+    def test_run_rejected_with_503_when_queue_full(self, client, sample_script, monkeypatch):
+        monkeypatch.setattr(_api_module, "_RUN_SLOTS", _api_module.threading.BoundedSemaphore(1))
+        _api_module._RUN_SLOTS.acquire()
+        r = client.post("/api/run", json={"script_path": str(sample_script), "enable_history": False})
+        assert r.status_code == 503
+        assert client.get("/api/runs").json() == []
+
     def test_restart_creates_new_run(self, client, sample_script):
         payload = {"script_path": str(sample_script), "enable_history": False}
         run_id = client.post("/api/run", json=payload).json()["run_id"]
@@ -316,6 +443,65 @@ class TestNewLifecycleEndpoints:
         assert "run_id" in data
         assert data["run_id"] != run_id  # New run ID
 
+    def test_restart_rejects_script_swapped_for_outside_symlink(self, client, sample_script, tmp_path):
+        payload = {"script_path": str(sample_script), "enable_history": False}
+        run_id = client.post("/api/run", json=payload).json()["run_id"]
+        _drain_runs()
+        outside = tmp_path / "outside.py"
+        outside.write_text("print('outside')\n")
+        sample_script.unlink()
+        sample_script.symlink_to(outside)
+        r = client.post(f"/api/runs/{run_id}/restart")
+        assert r.status_code == 400
+        assert len(client.get("/api/runs").json()) == 1
+
+    def _active_run(self, script) -> threading.Event:
+        req = _api_module.RunRequest(script_path=str(script), enable_history=False)
+        _api_module._validate_payload(req)
+        _api_module.RUN_STORE.upsert(_api_module.RunRecord(
+            id="active-id", status="running", started_at=datetime.utcnow(),
+            finished_at=None, request=req,
+        ))
+        cancel_event = threading.Event()
+        _api_module.RUN_HANDLES["active-id"] = {"cancel_event": cancel_event, "runner": None}
+        return cancel_event
+
+    def test_rejected_restart_leaves_active_run_alone(self, client, sample_script, tmp_path):
+        cancel_event = self._active_run(sample_script)
+        outside = tmp_path / "outside.py"
+        outside.write_text("print('outside')\n")
+        sample_script.unlink()
+        sample_script.symlink_to(outside)
+        try:
+            assert client.post("/api/runs/active-id/restart").status_code == 400
+            assert not cancel_event.is_set()
+            assert _api_module.RUN_STORE.get("active-id").status == "running"
+        finally:
+            _api_module.RUN_HANDLES.pop("active-id", None)
+
+    def test_restart_with_queue_full_leaves_active_run_alone(self, client, sample_script, monkeypatch):
+        cancel_event = self._active_run(sample_script)
+        monkeypatch.setattr(_api_module, "_RUN_SLOTS", _api_module.threading.BoundedSemaphore(1))
+        _api_module._RUN_SLOTS.acquire()
+        try:
+            assert client.post("/api/runs/active-id/restart").status_code == 503
+            assert not cancel_event.is_set()
+            assert _api_module.RUN_STORE.get("active-id").status == "running"
+        finally:
+            _api_module.RUN_HANDLES.pop("active-id", None)
+
+    def test_queued_run_rechecks_script_path_on_execution(self, client, sample_script, tmp_path):
+        req = _api_module.RunRequest(script_path=str(sample_script), enable_history=False)
+        _api_module._validate_payload(req)
+        outside = tmp_path / "outside.py"
+        outside.write_text("print('outside')\n")
+        sample_script.unlink()
+        sample_script.symlink_to(outside)
+        _api_module._execute_run("recheck-id", req, threading.Event())
+        record = _api_module.RUNS["recheck-id"]
+        assert record.status == "failed"
+        assert "Symlinks are not allowed" in record.error
+
     def test_stop_finished_run_returns_409(self, client, sample_script):
         """Stopping an already-completed run must return 409."""
         req = _api_module.RunRequest(script_path=str(sample_script), enable_history=False)
@@ -438,6 +624,133 @@ class TestLogsEndpoint:
         assert r.status_code == 200
         assert "hello" in r.text
 
+    def test_log_file_paths_not_exposed(self, client, sample_script):
+        req = _api_module.RunRequest(script_path=str(sample_script), enable_history=False)
+        rec = _api_module.RunRecord(
+            id="hidden-paths-id", status="completed", started_at=datetime.utcnow(),
+            finished_at=datetime.utcnow(), request=req,
+            stdout_path=_api_module._write_log_file("hidden-paths-id", "stdout", "out\n"),
+        )
+        _api_module.RUN_STORE.upsert(rec)
+        assert _api_module.RUN_STORE.get("hidden-paths-id").stdout_path == rec.stdout_path
+        stored = client.get("/api/runs/hidden-paths-id").json()
+        with _api_module.RUNS_LOCK:
+            _api_module.RUNS["hidden-paths-id"] = rec
+        cached = client.get("/api/runs/hidden-paths-id").json()
+        listed = client.get("/api/runs").json()[0]
+        for body in (stored, cached, listed):
+            assert "stdout_path" not in body and "stderr_path" not in body
+
+    def test_logs_streamed_from_log_files(self, client, sample_script):
+        req = _api_module.RunRequest(script_path=str(sample_script), enable_history=False)
+        rec = _api_module.RunRecord(
+            id="file-logs-id",
+            status="completed",
+            started_at=datetime.utcnow(),
+            finished_at=datetime.utcnow(),
+            request=req,
+            stdout_path=_api_module._write_log_file("file-logs-id", "stdout", "from file\n"),
+            stderr_path=_api_module._write_log_file("file-logs-id", "stderr", "warned\n"),
+        )
+        _api_module.RUN_STORE.upsert(rec)
+
+        r = client.get("/api/runs/file-logs-id/logs")
+        assert r.status_code == 200
+        assert r.text == "from file\n\n--- STDERR ---\nwarned\n"
+
+    def test_logs_gzipped_when_accepted(self, client, sample_script):
+        big = "log line\n" * 20000
+        req = _api_module.RunRequest(script_path=str(sample_script), enable_history=False)
+        _api_module.RUN_STORE.upsert(_api_module.RunRecord(
+            id="gz-logs-id", status="completed", started_at=datetime.utcnow(),
+            finished_at=datetime.utcnow(), request=req,
+            stdout_path=_api_module._write_log_file("gz-logs-id", "stdout", big),
+        ))
+        with client.stream("GET", "/api/runs/gz-logs-id/logs", headers={"Accept-Encoding": "gzip"}) as r:
+            raw = b"".join(r.iter_raw())
+            assert r.headers["content-encoding"] == "gzip"
+        assert len(raw) < len(big) // 10
+        assert gzip.decompress(raw).decode() == big
+
+        plain = client.get("/api/runs/gz-logs-id/logs", headers={"Accept-Encoding": "identity"})
+        assert "content-encoding" not in plain.headers
+        assert plain.text == big
+
+    def test_row_only_logs_sent_as_one_body(self, client, sample_script):
+        req = _api_module.RunRequest(script_path=str(sample_script), enable_history=False)
+        _api_module.RUN_STORE.upsert(_api_module.RunRecord(
+            id="row-logs-id", status="completed", started_at=datetime.utcnow(),
+            finished_at=datetime.utcnow(), request=req,
+            result={"stdout": "out\n", "stderr": "err\n", "returncode": 0, "metrics": {}},
+        ))
+        r = client.get("/api/runs/row-logs-id/logs", headers={"Accept-Encoding": "identity"})
+        assert r.text == "out\n\n--- STDERR ---\nerr\n"
+        assert r.headers["content-length"] == str(len(r.content))
+        with client.stream("GET", "/api/runs/row-logs-id/logs", headers={"Accept-Encoding": "gzip"}) as gz:
+            raw = b"".join(gz.iter_raw())
+            assert gz.headers["content-encoding"] == "gzip"
+        assert gzip.decompress(raw).decode() == r.text
+
+    def test_logged_output_not_duplicated_in_row(self, client, sample_script):
+        big = "x" * (_api_module._LOG_TAIL_CHARS + 100)
+        req = _api_module.RunRequest(script_path=str(sample_script), enable_history=False)
+        rec = _api_module.RunRecord(
+            id="tail-logs-id",
+            status="completed",
+            started_at=datetime.utcnow(),
+            finished_at=datetime.utcnow(),
+            request=req,
+            result={"stdout": big, "stderr": "", "returncode": 0},
+            stdout_path=_api_module._write_log_file("tail-logs-id", "stdout", big),
+        )
+        _api_module.RUN_STORE.upsert(rec)
+
+        loaded = _api_module.RUN_STORE.get("tail-logs-id")
+        assert loaded.result["stdout"] == _api_module._LOG_IN_FILE
+        assert len(_api_module.RUN_STORE.get_logs("tail-logs-id")["stdout"]) == _api_module._LOG_TAIL_CHARS
+        assert client.get("/api/runs/tail-logs-id/logs").text == big
+
+    def test_short_output_not_spilled_to_disk(self, client):
+        assert _api_module._spill_log("short-id", "stdout", "hello\n") is None
+        big = "y" * (_api_module._LOG_TAIL_CHARS + 1)
+        path = _api_module._spill_log("long-id", "stdout", big)
+        assert Path(path).read_text() == big
+
+    def test_only_spilled_stream_is_stripped(self, client, sample_script):
+        big = "z" * (_api_module._LOG_TAIL_CHARS + 10)
+        req = _api_module.RunRequest(script_path=str(sample_script), enable_history=False)
+        rec = _api_module.RunRecord(
+            id="mixed-logs-id",
+            status="completed",
+            started_at=datetime.utcnow(),
+            finished_at=datetime.utcnow(),
+            request=req,
+            result={"stdout": big, "stderr": "oops\n", "returncode": 1},
+            stdout_path=_api_module._spill_log("mixed-logs-id", "stdout", big),
+            stderr_path=_api_module._spill_log("mixed-logs-id", "stderr", "oops\n"),
+        )
+        _api_module.RUN_STORE.upsert(rec)
+
+        loaded = _api_module.RUN_STORE.get("mixed-logs-id")
+        assert loaded.result["stdout"] == _api_module._LOG_IN_FILE
+        assert loaded.result["stderr"] == "oops\n"
+        assert client.get("/api/runs/mixed-logs-id/logs").text == big + "\n--- STDERR ---\noops\n"
+
+    def test_delete_removes_log_files(self, client, sample_script):
+        path = _api_module._write_log_file("gone-logs-id", "stdout", "bye\n")
+        req = _api_module.RunRequest(script_path=str(sample_script), enable_history=False)
+        rec = _api_module.RunRecord(
+            id="gone-logs-id",
+            status="completed",
+            started_at=datetime.utcnow(),
+            finished_at=datetime.utcnow(),
+            request=req,
+            stdout_path=path,
+        )
+        _api_module.RUN_STORE.upsert(rec)
+        assert _api_module.RUN_STORE.delete("gone-logs-id")
+        assert not Path(path).exists()
+
 
 # ---------------------------------------------------------------------------
 # RunStore – new columns persist and round-trip correctly
@@ -461,6 +774,103 @@ class TestRunStorePersistence:
         assert loaded is not None
         assert loaded.correlation_id == "test-corr-uuid"
         assert loaded.run_status == "success"
+        assert isinstance(loaded.started_at, datetime)
+        assert isinstance(loaded.request, _api_module.RunRequest)
+        assert loaded.request.script_path == str(sample_script)
+        assert loaded.request.retry_max_attempts == 3
+
+    def test_large_result_stored_compressed(self, client, sample_script):
+        req = _api_module.RunRequest(script_path=str(sample_script), enable_history=False)
+        result = {"stdout": "line\n" * 1000, "stderr": "", "returncode": 0, "metrics": {"cpu_max": 1.5}}
+        _api_module.RUN_STORE.upsert(_api_module.RunRecord(
+            id="packed-id", status="completed", started_at=datetime.utcnow(),
+            finished_at=datetime.utcnow(), request=req, result=result,
+        ))
+        with _api_module.RUN_STORE._read() as conn:
+            raw = conn.execute("SELECT result_json FROM runs WHERE id = 'packed-id'").fetchone()[0]
+        assert isinstance(raw, bytes) and len(raw) < len(json.dumps(result))
+        assert _api_module.RUN_STORE.get("packed-id").result == result
+
+    def test_wal_checkpointed_by_writer_not_commits(self, client, sample_script):
+        store = _api_module.RUN_STORE
+        assert store._rw.execute("PRAGMA wal_autocheckpoint").fetchone()[0] == 0
+        req = _api_module.RunRequest(script_path=str(sample_script), enable_history=False)
+        for i in range(5):
+            store.upsert(_api_module.RunRecord(
+                id=f"ckpt-{i}", status="completed", started_at=datetime.utcnow(),
+                finished_at=datetime.utcnow(), request=req,
+            ))
+        store._writer.checkpoint()
+        busy, frames, done = store._rw.execute("PRAGMA wal_checkpoint(PASSIVE)").fetchone()
+        assert busy == 0 and frames == done
+
+    def test_failed_library_migration_leaves_writer_usable(self, tmp_path):
+        db_path = tmp_path / "broken.db"
+        store = _api_module.RunStore(db_path)
+        with store._write() as conn:
+            # A stale lib_scripts without missing_flag makes the index DDL fail.
+            conn.execute("CREATE TABLE lib_scripts (id INTEGER PRIMARY KEY, path TEXT)")
+        with pytest.raises(sqlite3.OperationalError):
+            _api_module.ScriptLibrary(db_path)
+        assert not store._rw.in_transaction
+        with store._write() as conn:
+            conn.execute("DELETE FROM runs")
+
+    def test_maintenance_thread_ends_with_its_writer(self, tmp_path):
+        db_path = tmp_path / "shared.db"
+        store = _api_module.RunStore(db_path)
+        library = _api_module.ScriptLibrary(db_path)
+        assert library._writer is store._writer
+        assert library._rw.execute("PRAGMA wal_autocheckpoint").fetchone()[0] == 0
+        writer = weakref.ref(store._writer)
+        thread = store._writer._maintenance
+        del store, library
+        gc.collect()
+        assert writer() is None
+        thread.join(timeout=2)
+        assert not thread.is_alive()
+
+    def test_packed_results_round_trip_without_zstandard(self, monkeypatch):
+        result = {"stdout": "x" * 5000}
+        assert _api_module._unpack_json(_api_module._pack_json(result)) == result
+        monkeypatch.setattr(_api_module, "zstandard", None)
+        zlib_blob = _api_module._pack_json(result)
+        assert zlib_blob[:4] != _api_module._ZSTD_MAGIC
+        assert _api_module._unpack_json(zlib_blob) == result
+
+    def test_zstd_blob_without_zstandard_raises_clear_error(self, monkeypatch):
+        if _api_module.zstandard is None:
+            pytest.skip("zstandard not installed")
+        blob = _api_module._pack_json({"stdout": "x" * 5000})
+        assert blob[:4] == _api_module._ZSTD_MAGIC
+        monkeypatch.setattr(_api_module, "zstandard", None)
+        with pytest.raises(ImportError, match="pip install zstandard"):
+            _api_module._unpack_json(blob)
+
+    def test_plain_text_result_rows_still_readable(self, client, sample_script):
+        req = _api_module.RunRequest(script_path=str(sample_script), enable_history=False)
+        _api_module.RUN_STORE.upsert(_api_module.RunRecord(
+            id="legacy-id", status="completed", started_at=datetime.utcnow(),
+            finished_at=datetime.utcnow(), request=req,
+        ))
+        with _api_module.RUN_STORE._write() as conn:
+            conn.execute("UPDATE runs SET result_json = ? WHERE id = 'legacy-id'", ('{"returncode": 3}',))
+        assert _api_module.RUN_STORE.get("legacy-id").result == {"returncode": 3}
+
+    def test_request_serialised_once_per_instance(self, client, sample_script, monkeypatch):
+        req = _api_module.RunRequest(script_path=str(sample_script), enable_history=False)
+        calls = []
+        real_dumps = _api_module._json_dumps
+        monkeypatch.setattr(_api_module, "_json_dumps", lambda obj: calls.append(obj) or real_dumps(obj))
+        for status in ("queued", "completed"):
+            _api_module.RUN_STORE.upsert(_api_module.RunRecord(
+                id="ser-once-id", status=status, started_at=datetime.utcnow(),
+                finished_at=None, request=req,
+            ))
+        assert len(calls) == 1
+        loaded = _api_module.RUN_STORE.get("ser-once-id")
+        assert loaded.request._json_cache == req._json_cache
+        assert "_json_cache" not in loaded.request.dict()
 
     def test_error_summary_round_trips(self, client, sample_script):
         summary = {"exit_code": 1, "status": "failed", "correlation_id": "xyz"}
@@ -477,11 +887,110 @@ class TestRunStorePersistence:
         loaded = _api_module.RUN_STORE.get("persist-err-id")
         assert loaded.error_summary == summary
 
+    def test_update_fields_changes_only_given_columns(self, client, sample_script):
+        req = _api_module.RunRequest(script_path=str(sample_script), enable_history=False)
+        rec = _api_module.RunRecord(
+            id="partial-update-id",
+            status="queued",
+            started_at=datetime.utcnow(),
+            finished_at=None,
+            request=req,
+            correlation_id="keep-me",
+        )
+        store = _api_module.RUN_STORE
+        store.upsert(rec)
+        assert store.update_fields("partial-update-id", status="running")
+        loaded = store.get("partial-update-id")
+        assert loaded.status == "running"
+        assert loaded.correlation_id == "keep-me"
+        assert not store.update_fields("no-such-run", status="running")
+        with pytest.raises(ValueError):
+            store.update_fields("partial-update-id", request_json="{}")
+
+    def test_bulk_delete_skips_active_runs(self, client, sample_script):
+        req = _api_module.RunRequest(script_path=str(sample_script), enable_history=False)
+        for run_id, status in (("bulk-a", "completed"), ("bulk-b", "failed"), ("bulk-c", "running")):
+            rec = _api_module.RunRecord(
+                id=run_id, status=status, started_at=datetime.utcnow(), finished_at=None, request=req,
+            )
+            _api_module.RUN_STORE.upsert(rec)
+            with _api_module.RUNS_LOCK:
+                _api_module.RUNS[run_id] = rec
+        r = client.request("DELETE", "/api/runs", json=["bulk-a", "bulk-b", "bulk-c", "bulk-missing"])
+        assert r.status_code == 200
+        assert r.json() == {"deleted": 2}
+        assert _api_module.RUN_STORE.get("bulk-a") is None
+        assert _api_module.RUN_STORE.get("bulk-c") is not None
+
+    def test_failed_write_is_rolled_back(self, client):
+        store = _api_module.RUN_STORE
+        with pytest.raises(RuntimeError):
+            with store._write() as conn:
+                conn.execute(
+                    "INSERT INTO runs (id, status, started_at, request_json) VALUES (?, ?, ?, ?)",
+                    ("rolled-back", "queued", datetime.utcnow().isoformat(), "{}"),
+                )
+                raise RuntimeError("boom")
+        assert store.get("rolled-back") is None
+
     def test_get_stats(self, client):
         stats = _api_module.RUN_STORE.get_stats()
         assert isinstance(stats["total_runs"], int)
         assert isinstance(stats["by_status"], dict)
 
+    def test_get_stats_counts_last_24h_in_utc(self, client, sample_script):
+        req = _api_module.RunRequest(script_path=str(sample_script), enable_history=False)
+        now = datetime.utcnow()
+        for run_id, age in (("recent-run", timedelta(hours=2)), ("old-run", timedelta(days=2))):
+            _api_module.RUN_STORE.upsert(_api_module.RunRecord(
+                id=run_id,
+                status="completed",
+                started_at=now - age,
+                finished_at=now - age,
+                request=req,
+            ))
+        stats = _api_module.RUN_STORE.get_stats()
+        assert stats == {"total_runs": 2, "by_status": {"completed": 2}, "runs_24h": 1}
+
+    def test_get_stats_cached_until_next_write(self, client, sample_script, monkeypatch):
+        store = _api_module.RUN_STORE
+        first = store.get_stats()
+        queries = []
+        real_read = store._read
+        monkeypatch.setattr(store, "_read", lambda: queries.append(1) or real_read())
+        assert store.get_stats() is first
+        assert queries == []
+
+        req = _api_module.RunRequest(script_path=str(sample_script), enable_history=False)
+        store.upsert(_api_module.RunRecord(
+            id="stats-cache-id", status="completed", started_at=datetime.utcnow(),
+            finished_at=None, request=req,
+        ))
+        assert store.get_stats()["total_runs"] == first["total_runs"] + 1
+        assert queries == [1]
+        assert client.get("/api/stats").headers["cache-control"] == "private, max-age=2"
+
+    def test_get_stats_24h_count_is_index_range(self, client):
+        store = _api_module.RUN_STORE
+        with store._read() as conn:
+            plan = " ".join(r[3] for r in conn.execute("EXPLAIN QUERY PLAN " + store._RUNS_24H_SQL, ("",)))
+        assert "SEARCH runs USING COVERING INDEX idx_runs_started_at (started_at>?)" in plan
+
+    def test_status_counts_follow_transitions_and_deletes(self, client, sample_script):
+        store = _api_module.RUN_STORE
+        req = _api_module.RunRequest(script_path=str(sample_script), enable_history=False)
+        for run_id in ("count-a", "count-b"):
+            store.upsert(_api_module.RunRecord(
+                id=run_id, status="queued", started_at=datetime.utcnow(), finished_at=None, request=req,
+            ))
+        store.update_fields("count-a", status="running")
+        store.upsert(_api_module.RunRecord(
+            id="count-b", status="completed", started_at=datetime.utcnow(), finished_at=None, request=req,
+        ))
+        assert store.get_stats()["by_status"] == {"completed": 1, "running": 1}
+        store.delete("count-b")
+        assert store.get_stats() == {"total_runs": 1, "by_status": {"running": 1}, "runs_24h": 1}
+
 
 # ---------------------------------------------------------------------------
 # Dashboard HTML
@@ -494,6 +1003,49 @@ class TestDashboard:
         assert r.status_code == 200
         assert "Script Runner" in r.text
 
+    def test_dashboard_etag_revalidation(self, client):
+        first = client.get("/")
+        etag = first.headers["etag"]
+        r = client.get("/", headers={"If-None-Match": etag})
+        assert r.status_code == 304
+        assert r.content == b""
+
+    def test_dashboard_served_precompressed(self, client):
+        r = client.get("/", headers={"Accept-Encoding": "gzip"})
+        assert r.headers["content-encoding"] == "gzip"
+        assert r.headers["vary"] == "Accept-Encoding"
+        assert "Script Runner" in r.text
+        plain = client.get("/", headers={"Accept-Encoding": "identity"})
+        assert "content-encoding" not in plain.headers
+        assert plain.text == r.text
+
+    def test_gzip_refused_with_zero_q_value(self, client):
+        r = client.get("/", headers={"Accept-Encoding": "gzip;q=0, identity"})
+        assert "content-encoding" not in r.headers
+        assert "Script Runner" in r.text
+
+    @pytest.mark.parametrize("header, expected", [
+        ("gzip", True),
+        ("deflate, gzip;q=0.5", True),
+        ("GZIP ; Q=1.0", True),
+        ("*", True),
+        ("gzip;q=0", False),
+        ("gzip;q=0.0, *;q=1", False),
+        ("*;q=0", False),
+        ("identity", False),
+        ("", False),
+    ])
+    def test_accepts_gzip_honours_q_values(self, header, expected):
+        request = SimpleNamespace(headers={"accept-encoding": header})
+        assert _api_module._accepts_gzip(request) is expected
+
+    def test_static_assets_cacheable(self, client):
+        r = client.get("/static/index.html")
+        assert r.headers["cache-control"] == "public, max-age=60"
+        again = client.get("/static/index.html", headers={"If-None-Match": r.headers["etag"]})
+        assert again.status_code == 304
+        assert again.headers["cache-control"] == "public, max-age=60"
+
     def test_dashboard_has_working_dir_field(self, client):
         r = client.get("/")
         assert "working-dir" in r.text
@@ -551,6 +1103,37 @@ class TestLibraryStats:
         r = client.get("/api/library/stats")
         assert r.json()["total_scripts"] == 0
 
+    def test_stats_cache_tracks_library_changes(self, client, tmp_path):
+        lib = _api_module.SCRIPT_LIBRARY
+        (tmp_path / "a.py").write_text("x\n")
+        (tmp_path / "b.py").write_text("y\n")
+        (tmp_path / "c.sh").write_text("z\n")
+        root = lib.create_folder_root(str(tmp_path), "Stats")
+        lib._do_scan(root, 0)
+        tag = lib.create_tag("stats")
+        items = {s["name"]: s for s in lib.list_scripts(root_id=root["id"])["items"]}
+        lib.update_script_status(items["a.py"]["id"], status="draft")
+        lib.update_script_status(items["b.py"]["id"], owner="Bob")
+
+        stats = lib.get_stats()
+        assert stats["total_scripts"] == 3
+        assert stats["by_language"] == {"Python": 2, "Bash": 1}
+        assert stats["by_lifecycle_status"] == {"active": 2, "draft": 1}
+        assert (stats["total_tags"], stats["total_roots"]) == (1, 1)
+
+        (tmp_path / "a.py").unlink()
+        lib._do_scan(root, 0)
+        lib.delete_tag(tag["id"])
+        stats = lib.get_stats()
+        assert stats["total_scripts"] == 2
+        assert stats["by_language"] == {"Python": 1, "Bash": 1}
+        assert stats["by_lifecycle_status"] == {"active": 2}
+        assert stats["total_tags"] == 0
+
+        (tmp_path / "a.py").write_text("x\n")
+        lib._do_scan(root, 0)
+        assert lib.get_stats()["by_lifecycle_status"] == {"active": 2, "draft": 1}
+
 
 class TestLibraryFolderRoots:
     def test_list_empty(self, client):
@@ -637,6 +1220,19 @@ class TestLibraryTags:
         r = client.delete("/api/library/tags/999999")
         assert r.status_code == 404
 
+    def test_library_reuses_pooled_connections(self, client):
+        lib = _api_module.SCRIPT_LIBRARY
+        lib.create_tag("pooled")
+        with pytest.raises(ValueError):
+            lib.create_tag("pooled")
+        # The failed insert must not leave the shared writer mid-transaction.
+        assert not lib._rw.in_transaction
+        with lib._read() as first, lib._read() as second:
+            assert first is second
+        # Both stores on the file write through one shared connection.
+        assert lib._rw is _api_module.RUN_STORE._rw
+        assert [t["name"] for t in lib.list_tags()] == ["pooled"]
+
     def test_tags_appear_in_list(self, client):
         client.post("/api/library/tags", json={"name": "visible"})
         r = client.get("/api/library/tags")
@@ -665,6 +1261,131 @@ class TestLibraryScripts:
                 break
         return root, script_id
 
+    def test_scan_batches_and_rescans(self, client, tmp_path, monkeypatch):
+        monkeypatch.setattr(_api_module, "_SCAN_BATCH_SIZE", 2)
+        lib = _api_module.SCRIPT_LIBRARY
+        for i in range(5):
+            (tmp_path / f"batch{i}.py").write_text("print(%d)\n" % i)
+        root = lib.create_folder_root(str(tmp_path), "Batched")
+
+        lib._do_scan(root, 0)
+        status = lib.get_scan_status(0)
+        assert status["status"] == "completed"
+        assert (status["new_count"], status["updated_count"], status["deleted_count"]) == (5, 0, 0)
+        assert status["files_scanned"] == 5
+        assert lib.list_scripts(root_id=root["id"])["total"] == 5
+
+        (tmp_path / "batch0.py").unlink()
+        changed = tmp_path / "batch1.py"
+        changed.write_text("print(1)\nprint(1)\n")
+        os.utime(changed, (0, 0))
+        lib._do_scan(root, 0)
+        status = lib.get_scan_status(0)
+        assert (status["new_count"], status["updated_count"], status["deleted_count"]) == (0, 1, 1)
+        items = {s["name"]: s for s in lib.list_scripts(root_id=root["id"])["items"]}
+        assert sorted(items) == ["batch1.py", "batch2.py", "batch3.py", "batch4.py"]
+        assert items["batch1.py"]["line_count"] == 2
+
+    def test_rescan_of_nested_root_sees_files_indexed_by_outer_root(self, client, tmp_path, monkeypatch):
+        lib = _api_module.SCRIPT_LIBRARY
+        inner_dir = tmp_path / "inner"
+        inner_dir.mkdir()
+        (tmp_path / "outer.py").write_text("print(0)\n")
+        (inner_dir / "shared.py").write_text("print(1)\n")
+        outer = lib.create_folder_root(str(tmp_path), "Outer")
+        inner = lib.create_folder_root(str(inner_dir), "Inner")
+        lib._do_scan(outer, 0)
+        assert lib.get_scan_status(0)["new_count"] == 2
+
+        reads = []
+        monkeypatch.setattr(_api_module, "_count_lines_quietly", lambda path: reads.append(path) or 0)
+        for _ in range(2):
+            lib._do_scan(inner, 0)
+            status = lib.get_scan_status(0)
+            assert (status["new_count"], status["updated_count"], status["deleted_count"]) == (0, 0, 0)
+            assert status["files_scanned"] == 1
+        assert reads == []
+        assert lib.list_scripts(root_id=outer["id"])["total"] == 2
+
+    def test_scan_include_and_exclude_patterns(self, client, tmp_path):
+        lib = _api_module.SCRIPT_LIBRARY
+        (tmp_path / "sub").mkdir()
+        for name in ("keep.py", "skip_me.py", "tool.sh", "notes.txt", "sub/deep.py"):
+            (tmp_path / name).write_text("x\n")
+        root = lib.create_folder_root(
+            str(tmp_path), "Filtered", include_patterns=".py, .txt", exclude_patterns="skip_*, sub/*.py",
+        )
+        lib._do_scan(root, 0)
+        names = sorted(s["name"] for s in lib.list_scripts(root_id=root["id"])["items"])
+        assert names == ["keep.py"]
+
+    def test_list_scripts_tags_with_pipe(self, client, tmp_path):
+        lib = _api_module.SCRIPT_LIBRARY
+        (tmp_path / "tagged.py").write_text("x\n")
+        (tmp_path / "plain.py").write_text("y\n")
+        root = lib.create_folder_root(str(tmp_path), "Tagged")
+        lib._do_scan(root, 0)
+        items = {s["name"]: s for s in lib.list_scripts(root_id=root["id"])["items"]}
+        for name in ("ci|cd", "ops"):
+            tag = lib.create_tag(name)
+            lib.add_tag_to_script(items["tagged.py"]["id"], tag["id"])
+        items = {s["name"]: s for s in lib.list_scripts(root_id=root["id"])["items"]}
+        assert sorted(items["tagged.py"]["tags"]) == ["ci|cd", "ops"]
+        assert items["plain.py"]["tags"] == []
+        assert lib.list_scripts(tag="ci|cd")["total"] == 1
+
+    def test_list_scripts_page_read_in_index_order(self, client):
+        with _api_module.SCRIPT_LIBRARY._read() as conn:
+            plan = " ".join(r[3] for r in conn.execute(
+                "EXPLAIN QUERY PLAN SELECT * FROM lib_scripts s WHERE s.missing_flag = 0 "
+                "AND s.root_id = 1 ORDER BY s.name LIMIT 50"
+            ))
+        assert "idx_lib_scripts_missing_root_name" in plan
+        assert "TEMP B-TREE" not in plan
+
+    def test_duplicate_groups_read_from_covering_index(self, client):
+        with _api_module.SCRIPT_LIBRARY._read() as conn:
+            plan = " ".join(r[3] for r in conn.execute(
+                "EXPLAIN QUERY PLAN SELECT name, size, line_count, COUNT(*) FROM lib_scripts "
+                "WHERE missing_flag = 0 AND size > 0 GROUP BY name, size, line_count"
+            ))
+        assert "COVERING INDEX idx_lib_scripts_dups" in plan
+        assert "TEMP B-TREE" not in plan
+
+    def test_update_script_status_merges_fields(self, client, tmp_path):
+        lib = _api_module.SCRIPT_LIBRARY
+        (tmp_path / "status.py").write_text("x\n")
+        root = lib.create_folder_root(str(tmp_path), "Status")
+        lib._do_scan(root, 0)
+        script_id = lib.list_scripts(root_id=root["id"])["items"][0]["id"]
+
+        assert lib.update_script_status(script_id, owner="Bob")
+        assert lib.update_script_status(script_id, status="draft", notes="n1")
+        detail = lib.get_script(script_id)
+        assert (detail["lifecycle_status"], detail["owner"], detail["notes"]) == ("draft", "Bob", "n1")
+        assert not lib.update_script_status(999999, status="draft")
+
+    def test_path_pattern_matcher_agrees_with_path_match(self):
+        patterns = ["sub/*.py", "/abs/x/*.py", "a/b/c.py"]
+        matches = _api_module._path_pattern_matcher(patterns)
+        for path in ("/r/sub/deep.py", "/r/sub/deeper/x.py", "/abs/x/y.py", "/r/abs/x/y.py",
+                     "/a/b/c.py", "/b/c.py", "/r/sub.py"):
+            expected = any(Path(path).match(pat) for pat in patterns)
+            assert matches(path) == expected, path
+
+    @pytest.mark.parametrize("chunk_size", [1, 2, 3, 1 << 20])
+    def test_count_lines_matches_text_iteration(self, tmp_path, monkeypatch, chunk_size):
+        monkeypatch.setattr(_api_module, "_LINE_COUNT_CHUNK", chunk_size)
+        f = tmp_path / "lines.txt"
+        for content in (
+            b"", b"a\n", b"a\nb", b"a\r\nb\r\n\n",
+            b"a\rb\rc", b"a\r", b"\r\r\n\n\r", b"a\r\r\nb",
+        ):
+            f.write_bytes(content)
+            with open(f, encoding="utf-8") as text:
+                expected = sum(1 for _ in text)
+            assert _api_module._count_lines(str(f)) == expected
+
     def test_list_scripts_empty(self, client):
         r = client.get("/api/library/scripts")
         assert r.status_code == 200
@@ -758,6 +1479,22 @@ class TestLibraryDuplicates:
         assert r.status_code == 200
         assert isinstance(r.json(), list)
 
+    def test_duplicates_grouped_with_awkward_paths(self, client, tmp_path):
+        lib = _api_module.SCRIPT_LIBRARY
+        for folder in ("a||b", "c", "d"):
+            (tmp_path / folder).mkdir()
+            (tmp_path / folder / "dup.py").write_text("same\n")
+        (tmp_path / "unique.py").write_text("other\n")
+        root = lib.create_folder_root(str(tmp_path), "Dups")
+        lib._do_scan(root, 0)
+
+        groups = lib.list_duplicates()
+        assert len(groups) == 1
+        group = groups[0]
+        assert (group["name"], group["count"]) == ("dup.py", 3)
+        assert sorted(group["paths"]) == sorted(str(tmp_path / f / "dup.py") for f in ("a||b", "c", "d"))
+        assert len(group["ids"]) == 3 and all(isinstance(i, int) for i in group["ids"])
+
 
 class TestRunFromLibrary:
     def test_run_nonexistent_script(self, client):